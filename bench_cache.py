@@ -0,0 +1,50 @@
+import time
+from navigator.roadmap import NodeFactory, EdgeFactory
+from navigator.roadmap_maker import RoadMapMaker
+
+LOAD_COUNT = 5
+
+def main():
+    fullerton_bbox = [-117.980, 33.850, -117.850, 33.920]
+
+    pbf = r"./socal-251212.osm.pbf"
+
+    cache_name = "fullerton"
+
+    pickle_reader = RoadMapMaker(fullerton_bbox, pbf, cache_name, stdout_enabled=False, cache_format="pickle")
+    arrow_reader = RoadMapMaker(fullerton_bbox, pbf, cache_name, stdout_enabled=False, cache_format="arrow")
+
+    # make sure both caches exist
+    nodes = pickle_reader._cache_load_gdf(f"{cache_name}_nodes")
+    edges = pickle_reader._cache_load_gdf(f"{cache_name}_edges")
+    if nodes is None or edges is None:
+        print(f"Extracting from PBF file '{pbf}'...")
+        nodes, edges = pickle_reader._load_raw_graph()
+        pickle_reader._cache_gdf(nodes, f"{cache_name}_nodes")
+        pickle_reader._cache_gdf(edges, f"{cache_name}_edges")
+    arrow_reader._cache_gdf(nodes, f"{cache_name}_nodes")
+    arrow_reader._cache_gdf(edges, f"{cache_name}_edges")
+
+    for label, reader, node_columns, edge_columns in [
+        ("pickle", pickle_reader, None, None),
+        ("arrow (all columns)", arrow_reader, None, None),
+        ("arrow (factory columns)", arrow_reader, NodeFactory.COLUMNS, EdgeFactory.COLUMNS),
+    ]:
+        benches:list[float] = []
+        for _ in range(LOAD_COUNT):
+            start_t = time.perf_counter()
+            reader._cache_load_gdf(f"{cache_name}_nodes", node_columns)
+            reader._cache_load_gdf(f"{cache_name}_edges", edge_columns)
+            end_t = time.perf_counter()
+            benches.append(end_t - start_t)
+
+        print(f"{label}: best {min(benches):.6f} seconds, average {sum(benches) / LOAD_COUNT:.6f} seconds over {LOAD_COUNT} loads.")
+
+    for tag in (f"{cache_name}_nodes", f"{cache_name}_edges"):
+        pickle_size = pickle_reader.get_cache_file_path(f"_{tag}_gdf").stat().st_size
+        arrow_size = arrow_reader.get_cache_file_path(f"_{tag}_gdf", RoadMapMaker.ARROW_EXTENSION).stat().st_size
+        print(f"{tag}: pickle {pickle_size / 1e6:.2f} MB | arrow {arrow_size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import time
+import random
+from navigator.roadmap import HeapFrontier, BucketFrontier, QuaternaryHeapFrontier
+from navigator.roadmap_maker import RoadMapMaker
+
+TEST_COUNT = 200
+
+def main():
+    fullerton_bbox = [-117.980, 33.850, -117.850, 33.920]
+
+    pbf = r"./socal-251212.osm.pbf"
+
+    cache_name = "fullerton"
+
+    graph_reader = RoadMapMaker(fullerton_bbox, pbf, cache_name)
+
+    graph = graph_reader.load()
+
+    # every frontier gets the exact same queries
+    rng = random.Random(0)
+    queries = []
+    for _ in range(TEST_COUNT):
+        rand_start = graph.lonlat_to_mercator(rng.uniform(-117.980, -117.850), rng.uniform(33.850, 33.920))
+        rand_end = graph.lonlat_to_mercator(rng.uniform(-117.980, -117.850), rng.uniform(33.850, 33.920))
+        queries.append((graph.find_node(*rand_start), graph.find_node(*rand_end)))
+
+    print("RESULTS ( A* | UCS ):")
+    baseline:list[float | None] | None = None
+    for frontier_type in (HeapFrontier, BucketFrontier, QuaternaryHeapFrontier):
+        bench1 = 0.0
+        bench2 = 0.0
+        time_estimates:list[float | None] = []
+
+        for start, destination in queries:
+            start_t = time.perf_counter()
+            graph.a_star_find_path(start, destination, frontier_type)
+            end_t = time.perf_counter()
+            bench1 += end_t - start_t
+
+            start_t = time.perf_counter()
+            path = graph.ucs_find_path(start, destination, frontier_type)
+            end_t = time.perf_counter()
+            bench2 += end_t - start_t
+
+            time_estimates.append(graph.get_path_time_estimate(path) if path else None)
+
+        if baseline is None:
+            baseline = time_estimates
+        matches = sum(
+            (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-9)
+            for a, b in zip(baseline, time_estimates)
+        )
+
+        print(f"{frontier_type.__name__}: b1:{bench1 / TEST_COUNT:.6f} | b2:{bench2 / TEST_COUNT:.6f} average seconds, UCS arrival matches heapq in {matches}/{TEST_COUNT} tests.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import time
+import random
+from navigator.roadmap_maker import RoadMapMaker
+
+TEST_COUNT = 200
+
+# a small city and a much larger area where memory layout matters more
+AREAS = [
+    ("fullerton", [-117.980, 33.850, -117.850, 33.920]),
+    ("north_orange_county", [-118.100, 33.750, -117.750, 33.950]),
+]
+
+def main():
+    pbf = r"./socal-251212.osm.pbf"
+
+    for cache_name, bbox in AREAS:
+        print(f"RESULTS for {cache_name} ( A* | CSR kernel ):")
+        baseline:list[float | None] | None = None
+        for node_order in ("none", "bfs", "hilbert"):
+            start_t = time.perf_counter()
+            graph = RoadMapMaker(bbox, pbf, cache_name, stdout_enabled=False, node_order=node_order).load()
+            build_t = time.perf_counter() - start_t
+
+            # same places for every ordering, snapped again since indices differ
+            rng = random.Random(0)
+            queries = []
+            for _ in range(TEST_COUNT):
+                rand_start = graph.lonlat_to_mercator(rng.uniform(bbox[0], bbox[2]), rng.uniform(bbox[1], bbox[3]))
+                rand_end = graph.lonlat_to_mercator(rng.uniform(bbox[0], bbox[2]), rng.uniform(bbox[1], bbox[3]))
+                queries.append((graph.find_node(*rand_start), graph.find_node(*rand_end)))
+
+            # compile and cache the CSR arrays outside the timings
+            graph.csr_find_path(*queries[0])
+
+            bench1 = 0.0
+            bench2 = 0.0
+            time_estimates:list[float | None] = []
+            for start, destination in queries:
+                start_t = time.perf_counter()
+                graph.a_star_find_path(start, destination)
+                end_t = time.perf_counter()
+                bench1 += end_t - start_t
+
+                start_t = time.perf_counter()
+                path = graph.csr_find_path(start, destination)
+                end_t = time.perf_counter()
+                bench2 += end_t - start_t
+
+                time_estimates.append(graph.get_path_time_estimate(path) if path else None)
+
+            if baseline is None:
+                baseline = time_estimates
+            matches = sum(
+                (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-9)
+                for a, b in zip(baseline, time_estimates)
+            )
+
+            print(f"{node_order}: build:{build_t:.3f}s | b1:{bench1 / TEST_COUNT:.6f} | b2:{bench2 / TEST_COUNT:.6f} average seconds, arrival matches unordered in {matches}/{TEST_COUNT} tests.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+RUN_COUNT = 5
+
+HEAVY_MODULES = ["pyrosm", "geopandas", "pandas", "PIL", "scipy", "numba"]
+
+# each measurement runs in a fresh interpreter so nothing is imported yet
+IMPORT_SCRIPT = """
+import time
+start_t = time.perf_counter()
+import navigator.roadmap_maker
+print(time.perf_counter() - start_t)
+"""
+
+FIRST_ROUTE_SCRIPT = """
+import sys
+import time
+start_t = time.perf_counter()
+from navigator.roadmap_maker import RoadMapMaker
+import_t = time.perf_counter()
+
+fullerton_bbox = [-117.980, 33.850, -117.850, 33.920]
+graph = RoadMapMaker(fullerton_bbox, r"./socal-251212.osm.pbf", "fullerton", stdout_enabled=False).load()
+load_t = time.perf_counter()
+
+start = graph.find_node(*graph.lonlat_to_mercator(-117.95, 33.87))
+destination = graph.find_node(*graph.lonlat_to_mercator(-117.88, 33.90))
+graph.a_star_find_path(start, destination)
+route_t = time.perf_counter()
+
+print(import_t - start_t, load_t - import_t, route_t - load_t, route_t - start_t)
+print(" ".join(module for module in %r if module in sys.modules))
+""" % (HEAVY_MODULES,)
+
+def run(script:str) -> list[str]:
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()
+
+def main():
+    # make sure the columnar cache exists before timing anything
+    run(FIRST_ROUTE_SCRIPT)
+
+    import_times = [float(run(IMPORT_SCRIPT)[0]) for _ in range(RUN_COUNT)]
+    print(f"Importing navigator.roadmap_maker took {min(import_times):.6f} seconds (best of {RUN_COUNT}).")
+
+    runs = [run(FIRST_ROUTE_SCRIPT) for _ in range(RUN_COUNT)]
+    timings = [[float(value) for value in lines[0].split()] for lines in runs]
+    best = min(timings, key=lambda timing: timing[3])
+    print(f"Time to first route: {best[3]:.6f} seconds (best of {RUN_COUNT}).")
+    print(f"  import {best[0]:.6f} | load {best[1]:.6f} | snap and route {best[2]:.6f}")
+
+    loaded = runs[0][1] if len(runs[0]) > 1 else ""
+    print(f"Heavy modules imported on the query path: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,5 +3,8 @@ from navigator.roadmap.node import Node
 from navigator.roadmap.edge import Edge
 from navigator.roadmap.node_factory import NodeFactory
 from navigator.roadmap.edge_factory import EdgeFactory
-from navigator.roadmap.edge_types import Road
+from navigator.roadmap.edge_types import Road, ChainRoad
 from navigator.roadmap.node_types import Junction, ShapePoint, TrafficControl
+from navigator.roadmap.budget import SearchBudget, CancellationToken, BudgetExceeded
+from navigator.roadmap.frontier import Frontier, HeapFrontier, BucketFrontier, QuaternaryHeapFrontier
+from navigator.roadmap.profiles import VehicleProfile, CAR, BOX_TRUCK, E_BIKE, PROFILES
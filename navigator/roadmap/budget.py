@@ -0,0 +1,164 @@
+from __future__ import annotations
+import heapq
+import math
+import threading
+import time
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from navigator.roadmap.edge import Edge
+    from navigator.roadmap.node import Node
+
+class CancellationToken:
+    """
+    Lets another thread stop a running search.  The search checks the
+    token every time it settles a node.  The compiled search kernel
+    can't wait on an event, so it reads `flag` instead.
+    """
+    _event:threading.Event
+    flag:np.ndarray
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self.flag = np.zeros(1, dtype=np.uint8)
+
+    def cancel(self) -> None:
+        self.flag[0] = 1
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when a search runs out of its `SearchBudget`.
+
+    `reason` is one of "settled", "cost", "deadline" or "cancelled".
+    `partial_path` is the path to the settled node closest to the
+    destination, when the budget asked for it.
+    """
+    reason:str
+    partial_path:list[Node|Edge] | None
+
+    def __init__(self, reason:str, partial_path:list[Node|Edge] | None = None) -> None:
+        super().__init__(f"Search budget exceeded ({reason})")
+        self.reason = reason
+        self.partial_path = partial_path
+
+
+class SearchBudget:
+    """
+    Per query limits for a search: how many nodes it may settle, the
+    highest path cost in hours it may settle, and how many seconds it may
+    run.  A budget holds no per search state, so one can be shared by many
+    queries and threads.
+    """
+    max_settled:int | None
+    max_cost:float
+    timeout:float | None
+    token:CancellationToken | None
+    partial_path:bool
+
+    def __init__(self,
+        max_settled:int | None = None,
+        max_cost:float = math.inf,
+        timeout:float | None = None,
+        token:CancellationToken | None = None,
+        partial_path:bool = False
+    ) -> None:
+        self.max_settled = max_settled
+        self.max_cost = max_cost
+        # in seconds from the start of each search
+        self.timeout = timeout
+        self.token = token
+        # rebuilding the best partial path costs a little, so it is opt in
+        self.partial_path = partial_path
+
+    def deadline(self) -> float:
+        """
+        The `time.monotonic` value a search starting now must finish by.
+        """
+        return math.inf if self.timeout is None else time.monotonic() + self.timeout
+
+    def exceeded(self, settled:int, cost:float, deadline:float) -> str | None:
+        """
+        Checks the budget before settling another node.
+
+        :return: Why the search has to stop, or None if it may go on.
+        :rtype: str | None
+        """
+        if self.token is not None and self.token.cancelled:
+            return "cancelled"
+        if self.max_settled is not None and settled >= self.max_settled:
+            return "settled"
+        if cost > self.max_cost:
+            return "cost"
+        if deadline != math.inf and time.monotonic() > deadline:
+            return "deadline"
+        return None
+
+
+class DeadlineWatcher:
+    """
+    One daemon thread raising the deadline flag of every compiled search
+    whose time is up, so budgeted queries don't each start a timer
+    thread.  The thread starts with the first watched search.
+    """
+    _condition:threading.Condition
+    _deadlines:list[tuple[float, int, np.ndarray]]
+    _released:set[int]
+    _counter:int
+    _thread:threading.Thread | None
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._deadlines = []
+        self._released = set()
+        self._counter = 0
+        self._thread = None
+
+    def watch(self, deadline:float, flag:np.ndarray) -> int:
+        """
+        Sets `flag[0]` once `time.monotonic` passes `deadline`.
+
+        :return: The key to `release` the flag with when the search ends.
+        :rtype: int
+        """
+        with self._condition:
+            key = self._counter
+            self._counter += 1
+            heapq.heappush(self._deadlines, (deadline, key, flag))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-deadlines", daemon=True)
+                self._thread.start()
+            elif self._deadlines[0][1] == key:
+                # the new deadline is the soonest, wake the watcher early
+                self._condition.notify()
+            return key
+
+    def release(self, key:int) -> None:
+        with self._condition:
+            self._released.add(key)
+            # finished searches are dropped once they make up most of the heap
+            if len(self._released) * 2 > len(self._deadlines):
+                self._deadlines = [entry for entry in self._deadlines if entry[1] not in self._released]
+                heapq.heapify(self._deadlines)
+                self._released.clear()
+
+    def _run(self) -> None:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, key, flag = heapq.heappop(self._deadlines)
+                    if key in self._released:
+                        self._released.discard(key)
+                    else:
+                        flag[0] = 1
+                self._condition.wait(self._deadlines[0][0] - now if self._deadlines else None)
+
+# shared by every compiled search in the process
+DEADLINES = DeadlineWatcher()
@@ -0,0 +1,107 @@
+from typing import Callable
+from navigator.roadmap.node import Node
+
+
+def _neighbors(node:Node) -> list[Node]:
+    return [edge.end for edge in node.edges if edge.end]
+
+def strongly_connected_components(nodes:list[Node],
+neighbors_of:Callable[[Node], list[Node]] = _neighbors) -> list[list[Node]]:
+    """
+    Tarjan's algorithm written with an explicit stack so large road
+    networks can't hit the recursion limit.  `neighbors_of` lists the
+    nodes a node has roads to.
+
+    Components come out in reverse topological order: if any road leads
+    from component `a` to component `b` then `a` is listed after `b`.
+    """
+    index_of:dict[Node, int] = {}
+    low_link:dict[Node, int] = {}
+    on_stack:set[Node] = set()
+    stack:list[Node] = []
+    components:list[list[Node]] = []
+    counter = 0
+
+    for root in nodes:
+        if root in index_of:
+            continue
+
+        index_of[root] = low_link[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work:list[tuple[Node, list[Node], int]] = [(root, neighbors_of(root), 0)]
+
+        while work:
+            node, neighbors, position = work[-1]
+
+            if position < len(neighbors):
+                work[-1] = (node, neighbors, position + 1)
+                neighbor = neighbors[position]
+                if neighbor not in index_of:
+                    index_of[neighbor] = low_link[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, neighbors_of(neighbor), 0))
+                elif neighbor in on_stack:
+                    low_link[node] = min(low_link[node], index_of[neighbor])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low_link[parent] = min(low_link[parent], low_link[node])
+
+            if low_link[node] == index_of[node]:
+                component:list[Node] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member is node:
+                        break
+                components.append(component)
+
+    return components
+
+def weakly_connected_components(nodes:list[Node],
+neighbors_of:Callable[[Node], list[Node]] = _neighbors) -> list[list[Node]]:
+    """
+    Groups nodes that are connected when one way restrictions are ignored.
+    """
+    undirected:dict[Node, list[Node]] = {node: [] for node in nodes}
+    for node in nodes:
+        for neighbor in neighbors_of(node):
+            undirected[node].append(neighbor)
+            undirected.setdefault(neighbor, []).append(node)
+
+    seen:set[Node] = set()
+    components:list[list[Node]] = []
+    for root in nodes:
+        if root in seen:
+            continue
+        seen.add(root)
+        component = [root]
+        frontier = [root]
+        while frontier:
+            for neighbor in undirected[frontier.pop()]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+                    frontier.append(neighbor)
+        components.append(component)
+
+    return components
+
+def tag_components(nodes:list[Node]) -> None:
+    """
+    Stores the strongly and weakly connected component ids on every node.
+    """
+    for component_id, component in enumerate(strongly_connected_components(nodes)):
+        for node in component:
+            node.component = component_id
+
+    for component_id, component in enumerate(weakly_connected_components(nodes)):
+        for node in component:
+            node.weak_component = component_id
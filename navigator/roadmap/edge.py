@@ -1,10 +1,12 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Literal
-from shapely.geometry import LineString
 from navigator.roadmap.node import Node
 from navigator.roadmap.types import EdgeDataDict
+if TYPE_CHECKING:
+    from shapely.geometry import LineString
 
 class Edge:
+    index:int
     start:Node | None
     end:Node | None
     geometry:LineString
@@ -12,6 +14,7 @@ class Edge:
     
 
     def __init__(self, start:Node | None, end:Node | None, geometry:LineString) -> None:
+        self.index = -1
         self.start = start
         self.end = end
         self.geometry = geometry
@@ -1,15 +1,20 @@
-from typing import Any
-from pandas import Series
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Mapping
 from navigator.roadmap.edge_types import Road
 from navigator.roadmap.edge import Edge
 from navigator.roadmap.node import Node
+if TYPE_CHECKING:
+    from pandas import Series
 
 
 class EdgeFactory(Edge):
     """
-    Helper to convert GeoDataFrame rows to Edges
+    Helper to convert GeoDataFrame rows (or plain row dicts) to Edges
     """
 
+    # edge columns read by `produce` and `RoadMapMaker.convert_gdf_to_graph`
+    COLUMNS = ["u", "v", "highway", "maxspeed", "lanes", "oneway", "length", "geometry"]
+
     HIGHWAY_DRIVABLE = {
         "motorway", "motorway_link",
         "trunk", "trunk_link",
@@ -22,13 +27,13 @@ class EdgeFactory(Edge):
     }
 
     @classmethod
-    def produce(cls, row:Series, start_node:Node | None, end_node:Node | None) -> Edge:
+    def produce(cls, row:Series | Mapping[str, Any], start_node:Node | None, end_node:Node | None) -> Edge:
         if row["highway"] in cls.HIGHWAY_DRIVABLE:
             # road can be driven on
             return Road(
                 start_node,
                 end_node,
-                geometry = row.geometry,
+                geometry = row['geometry'],
                 max_speed = row.get('maxspeed', "25 mph") if row.get('maxspeed', "25 mph") else "25 mph",
                 lanes = int(row.get('lanes', 1)) if row.get('lanes', 1) else 1,
                 oneway = bool(row.get('oneway', True)) if row.get('oneway', True) else True,
@@ -39,5 +44,5 @@ class EdgeFactory(Edge):
             return Edge(
                 start_node,
                 end_node,
-                geometry = row.geometry
+                geometry = row['geometry']
             )
\ No newline at end of file
@@ -1,7 +1,37 @@
+import numpy as np
+import shapely
 from shapely import LineString
 from navigator.roadmap.edge import Edge
 from navigator.roadmap.node import Node
 
+def join_coordinates(edges:list[Edge]) -> np.ndarray:
+    """
+    The coordinates of consecutive edges in driving order, from the first
+    start node to the last end node, read from all their geometries at
+    once.  Both directions of a two way road share one geometry, so an
+    edge whose geometry ends at its start node is flipped, and the point
+    repeated where two edges meet is kept once.
+    """
+    geometries = np.array([edge.geometry for edge in edges], dtype=object)
+    coords = shapely.get_coordinates(geometries)
+    counts = shapely.get_num_coordinates(geometries)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # a road runs backwards when its last point is nearer its start node than its first point
+    starts = np.array([(edge.start.x, edge.start.y) if edge.start else (np.nan, np.nan) for edge in edges], dtype=np.float64)
+    first = coords[offsets]
+    last = coords[offsets + counts - 1]
+    flipped = np.sum((last - starts) ** 2, axis=1) < np.sum((first - starts) ** 2, axis=1)
+
+    owner = np.repeat(np.arange(len(edges)), counts)
+    positions = np.arange(len(coords))
+    positions = np.where(flipped[owner], 2 * offsets[owner] + counts[owner] - 1 - positions, positions)
+    coords = coords[positions]
+
+    keep = np.ones(len(coords), dtype=np.bool_)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    return coords[keep]
+
 class Road(Edge):
 
     def __init__(self, start: Node | None, end: Node | None, geometry: LineString,
@@ -17,4 +47,26 @@ class Road(Edge):
         self.data['road_type'] = road_type
         # length is in meters, so we will convert to miles like speed limit
         self.data['length'] = length / 1609.344
-        
\ No newline at end of file
+        
+
+class ChainRoad(Edge):
+    """
+    A routing edge standing in for a chain of edges joined by shape points.
+    The original edges are kept in `segments` so paths can be expanded
+    back for drawing and time estimates.
+    """
+    segments:list[Edge]
+
+    def __init__(self, start: Node | None, end: Node | None, segments:list[Edge]) -> None:
+        super().__init__(start, end, LineString(join_coordinates(segments)))
+        self.segments = segments
+        self.data = dict(segments[0].data) # type: ignore
+        if 'length' in self.data:
+            self.data['length'] = sum(segment.data.get('length', 0.0) for segment in segments)
+
+    @property
+    def shape_points(self) -> list[Node]:
+        """
+        The nodes between the segments of the chain.
+        """
+        return [segment.end for segment in self.segments[:-1]] # type: ignore
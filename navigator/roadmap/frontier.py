@@ -0,0 +1,199 @@
+import heapq
+from abc import ABC, abstractmethod
+from navigator.roadmap.node import Node
+
+class Frontier(ABC):
+    """
+    The priority queue of nodes a search still has to expand.
+
+    Implementations that support decrease-key update a node already in
+    the frontier instead of queueing a second, stale entry for it.
+    Subclasses missing any of the methods below can't be constructed.
+    """
+
+    @abstractmethod
+    def push(self, priority:float, node:Node) -> None:
+        ...
+
+    @abstractmethod
+    def pop(self) -> tuple[float, Node]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+class HeapFrontier(Frontier):
+    """
+    Binary heap from `heapq`.  Ties pop in the order they were pushed.
+    """
+    heap:list[tuple[float, int, Node]]
+    counter:int
+
+    def __init__(self) -> None:
+        self.heap = []
+        self.counter = 0
+
+    def push(self, priority:float, node:Node) -> None:
+        heapq.heappush(self.heap, (priority, self.counter, node))
+        self.counter += 1
+
+    def pop(self) -> tuple[float, Node]:
+        priority, _, node = heapq.heappop(self.heap)
+        return priority, node
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+class BucketFrontier(Frontier):
+    """
+    Monotone bucket queue (Dial's algorithm) over costs quantized into
+    buckets `bucket_width` wide.
+
+    Only the bucket currently being drained is kept as a heap, so pushes
+    into later buckets are plain appends and the order inside a bucket
+    stays exact.  Priorities that fall behind the current bucket, which
+    A*'s running average heuristic can produce, are queued in the
+    current bucket.
+    """
+    # one second, in road_cost hours
+    BUCKET_WIDTH = 1 / 3600
+
+    bucket_width:float
+    buckets:dict[int, list[tuple[float, int, Node]]]
+    bucket_ids:list[int]
+    current_bucket:int
+    current:list[tuple[float, int, Node]]
+    counter:int
+    size:int
+
+    def __init__(self, bucket_width:float = BUCKET_WIDTH) -> None:
+        self.bucket_width = bucket_width
+        self.buckets = {}
+        # far away buckets (e.g. unknown road lengths) are found through a
+        # heap of bucket ids instead of scanning the empty buckets between
+        self.bucket_ids = []
+        self.current_bucket = 0
+        self.current = []
+        self.counter = 0
+        self.size = 0
+
+    def push(self, priority:float, node:Node) -> None:
+        entry = (priority, self.counter, node)
+        self.counter += 1
+        self.size += 1
+
+        bucket_id = int(priority / self.bucket_width)
+        if bucket_id <= self.current_bucket:
+            heapq.heappush(self.current, entry)
+            return
+
+        bucket = self.buckets.get(bucket_id)
+        if bucket is None:
+            self.buckets[bucket_id] = [entry]
+            heapq.heappush(self.bucket_ids, bucket_id)
+        else:
+            bucket.append(entry)
+
+    def pop(self) -> tuple[float, Node]:
+        if not self.current:
+            self.current_bucket = heapq.heappop(self.bucket_ids)
+            self.current = self.buckets.pop(self.current_bucket)
+            heapq.heapify(self.current)
+
+        priority, _, node = heapq.heappop(self.current)
+        self.size -= 1
+        return priority, node
+
+    def __len__(self) -> int:
+        return self.size
+
+class QuaternaryHeapFrontier(Frontier):
+    """
+    Indexed 4-ary heap with decrease-key.
+
+    Every node is in the heap at most once, and the shallower tree means
+    fewer levels to sift through than a binary heap.
+    """
+    nodes:list[Node]
+    priorities:list[float]
+    position:dict[Node, int]
+
+    def __init__(self) -> None:
+        self.nodes = []
+        self.priorities = []
+        self.position = {}
+
+    def push(self, priority:float, node:Node) -> None:
+        index = self.position.get(node)
+        if index is None:
+            self.nodes.append(node)
+            self.priorities.append(priority)
+            self._sift_up(len(self.nodes) - 1)
+        elif priority < self.priorities[index]:
+            self.priorities[index] = priority
+            self._sift_up(index)
+
+    def pop(self) -> tuple[float, Node]:
+        node = self.nodes[0]
+        priority = self.priorities[0]
+        del self.position[node]
+
+        last_node = self.nodes.pop()
+        last_priority = self.priorities.pop()
+        if self.nodes:
+            self.nodes[0] = last_node
+            self.priorities[0] = last_priority
+            self._sift_down(0)
+
+        return priority, node
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _sift_up(self, index:int) -> None:
+        nodes = self.nodes
+        priorities = self.priorities
+        node = nodes[index]
+        priority = priorities[index]
+
+        while index > 0:
+            parent = (index - 1) >> 2
+            if priorities[parent] <= priority:
+                break
+            nodes[index] = nodes[parent]
+            priorities[index] = priorities[parent]
+            self.position[nodes[index]] = index
+            index = parent
+
+        nodes[index] = node
+        priorities[index] = priority
+        self.position[node] = index
+
+    def _sift_down(self, index:int) -> None:
+        nodes = self.nodes
+        priorities = self.priorities
+        size = len(nodes)
+        node = nodes[index]
+        priority = priorities[index]
+
+        while True:
+            first_child = (index << 2) + 1
+            if first_child >= size:
+                break
+            best_child = first_child
+            best_priority = priorities[first_child]
+            for child in range(first_child + 1, min(first_child + 4, size)):
+                if priorities[child] < best_priority:
+                    best_child = child
+                    best_priority = priorities[child]
+            if best_priority >= priority:
+                break
+            nodes[index] = nodes[best_child]
+            priorities[index] = best_priority
+            self.position[nodes[index]] = index
+            index = best_child
+
+        nodes[index] = node
+        priorities[index] = priority
+        self.position[node] = index
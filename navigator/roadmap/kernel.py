@@ -0,0 +1,105 @@
+import heapq
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# True when searches run as compiled code that releases the GIL
+JIT_AVAILABLE = njit is not None
+
+# why `_csr_search` stopped, the same reasons `SearchBudget.exceeded` gives
+STOP_REASONS = (None, "settled", "cost", "deadline", "cancelled")
+
+def _csr_search(indptr:np.ndarray, targets:np.ndarray, costs:np.ndarray, node_x:np.ndarray, node_y:np.ndarray,
+source:int, destination:int, hours_per_mile:float, max_settled:int, max_cost:float,
+cancel_flag:np.ndarray, deadline_flag:np.ndarray) -> tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Dijkstra, or A* when `hours_per_mile` is above zero, over a CSR
+    adjacency.  The straight line distance to the destination times
+    `hours_per_mile` is the A* heuristic.
+
+    Before settling a node the search stops when it has settled
+    `max_settled` nodes (-1 for no limit), when the node costs more than
+    `max_cost`, or when another thread has set `cancel_flag[0]` or
+    `deadline_flag[0]`.
+
+    This exact function is both the compiled kernel and the pure-Python
+    fallback, so both give bit-identical results.
+
+    :return: For every node the CSR slot of the edge it was reached
+        through (-1 if unreached) and its path cost, the index into
+        `STOP_REASONS` of why the search stopped early (0 if it did not),
+        and the settled node closest to the destination in a straight line.
+    """
+    node_count = indptr.shape[0] - 1
+    path_cost = np.full(node_count, np.inf)
+    came_from = np.full(node_count, -1, dtype=np.int64)
+    explored = np.zeros(node_count, dtype=np.bool_)
+
+    destination_x = node_x[destination]
+    destination_y = node_y[destination]
+
+    path_cost[source] = 0.0
+    counter = 0
+    delta_x = node_x[source] - destination_x
+    delta_y = node_y[source] - destination_y
+    heuristic = hours_per_mile * math.sqrt(delta_x * delta_x + delta_y * delta_y)
+    frontier = [(heuristic, counter, source)]
+    counter += 1
+
+    settled = 0
+    stop_reason = 0
+    closest = source
+    closest_distance = np.inf
+
+    while len(frontier) > 0:
+        _, _, current_node = heapq.heappop(frontier)
+
+        if explored[current_node]:
+            continue
+
+        if current_node == destination:
+            break
+
+        if cancel_flag[0] != 0:
+            stop_reason = 4
+            break
+        if max_settled >= 0 and settled >= max_settled:
+            stop_reason = 1
+            break
+        if path_cost[current_node] > max_cost:
+            stop_reason = 2
+            break
+        if deadline_flag[0] != 0:
+            stop_reason = 3
+            break
+
+        explored[current_node] = True
+        settled += 1
+        delta_x = node_x[current_node] - destination_x
+        delta_y = node_y[current_node] - destination_y
+        if delta_x * delta_x + delta_y * delta_y < closest_distance:
+            closest_distance = delta_x * delta_x + delta_y * delta_y
+            closest = current_node
+
+        for slot in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = targets[slot]
+            if explored[neighbor]:
+                continue
+
+            cost = path_cost[current_node] + costs[slot]
+            if cost < path_cost[neighbor]:
+                path_cost[neighbor] = cost
+                came_from[neighbor] = slot
+                delta_x = node_x[neighbor] - destination_x
+                delta_y = node_y[neighbor] - destination_y
+                heuristic = hours_per_mile * math.sqrt(delta_x * delta_x + delta_y * delta_y)
+                heapq.heappush(frontier, (cost + heuristic, counter, neighbor))
+                counter += 1
+
+    return came_from, path_cost, stop_reason, closest
+
+csr_search = njit(nogil=True, cache=True)(_csr_search) if njit is not None else _csr_search
@@ -7,17 +7,26 @@ if TYPE_CHECKING:
 
 class Node:
     id:int
+    index:int
+    component:int
+    weak_component:int
     x:float
     y:float
     tags:dict[str, Any]
     edges:list[Edge]
+    in_edges:list[Edge]
     data:NodeDataDict
 
     def __init__(self, id:int, x:float, y:float, tags:dict[str, Any]) -> None:
         self.id = id
+        self.index = -1
+        # every node shares one component until the components are tagged
+        self.component = 0
+        self.weak_component = 0
         self.x = x
         self.y = y
         self.edges = []
+        self.in_edges = []
         self.tags = tags
         self.data = {}
 
@@ -1,17 +1,24 @@
-from typing import Any
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Mapping
 from navigator.roadmap.node import Node
-from pandas import Series
-from geopandas import GeoDataFrame
 
 from navigator.roadmap.node_types import Junction, ShapePoint, TrafficControl
+if TYPE_CHECKING:
+    from pandas import Series
 
 class NodeFactory:
     """
-    Helper to convert GeoDataFrame rows to Nodes
+    Helper to convert GeoDataFrame rows (or plain row dicts) to Nodes
     """
 
+    # node columns read by `produce`
+    COLUMNS = ["id", "lon", "lat", "tags"]
+
     @classmethod
-    def produce(cls, row:Series, edges_gdf:GeoDataFrame) -> Node:
+    def produce(cls, row:Series | Mapping[str, Any], connections:int) -> Node:
+        """
+        `connections` is the number of edge rows that start or end at the node.
+        """
         if isinstance(row["tags"], dict) and row["tags"].get("highway") in {
             "traffic_signals", "stop", "crossing", "give_way", "roundabout"
         }:
@@ -22,21 +29,20 @@ class NodeFactory:
                 row['lat'],
                 row.get('tags', {}) if row.get('tags', {}) else {}
             )
-        edges_connected = edges_gdf[(edges_gdf.u == row['id']) | (edges_gdf.v == row['id'])]
-        if not row["tags"] and len(edges_connected) == 2:
+        if not row["tags"] and connections == 2:
             return ShapePoint(
                 row['id'],
                 row['lon'],
                 row['lat'],
                 row.get('tags', {}) if row.get('tags', {}) else {}
             )
-        if len(edges_connected) >= 3:
+        if connections >= 3:
             return Junction(
                 row['id'],
                 row['lon'],
                 row['lat'],
                 row.get('tags', {}) if row.get('tags', {}) else {},
-                len(edges_connected)
+                connections
             )
         return Node(
             row['id'],
@@ -0,0 +1,74 @@
+import numpy as np
+from navigator.roadmap.node import Node
+from navigator.roadmap.roadmap import RoadMap
+
+def hilbert_index(x:np.ndarray, y:np.ndarray, order:int = 16) -> np.ndarray:
+    """
+    Position of every `(x, y)` cell along a Hilbert curve filling a
+    `2**order` by `2**order` grid.  Cells close on the curve are close on
+    the map.
+    """
+    side = 1 << order
+    x = x.astype(np.int64)
+    y = y.astype(np.int64)
+    index = np.zeros(x.shape, dtype=np.int64)
+
+    step = side >> 1
+    while step > 0:
+        rx = (x & step) > 0
+        ry = (y & step) > 0
+        index += step * step * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+
+        # rotate the quadrant so the curve continues in the right direction
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        step >>= 1
+
+    return index
+
+def hilbert_order(nodes:list[Node], order:int = 16) -> list[Node]:
+    """
+    Sorts nodes along a Hilbert curve over their mercator coordinates.
+    """
+    if not nodes:
+        return []
+
+    xy = np.array([RoadMap.lonlat_to_mercator(node.x, node.y) for node in nodes], dtype=np.float64)
+    low = xy.min(axis=0)
+    extent = max(float((xy.max(axis=0) - low).max()), 1e-12)
+    cells = ((xy - low) / extent * ((1 << order) - 1)).astype(np.int64)
+
+    # stable so nodes sharing a cell keep their relative order
+    ranking = np.argsort(hilbert_index(cells[:, 0], cells[:, 1], order), kind="stable")
+    return [nodes[i] for i in ranking]
+
+def bfs_order(nodes:list[Node]) -> list[Node]:
+    """
+    Orders nodes breadth first over the roads, ignoring one way
+    restrictions, so neighbouring nodes get neighbouring indices.
+    """
+    undirected:dict[Node, list[Node]] = {node: [] for node in nodes}
+    for node in nodes:
+        for edge in node.edges:
+            if edge.end in undirected:
+                undirected[node].append(edge.end) # type: ignore
+                undirected[edge.end].append(node) # type: ignore
+
+    seen:set[Node] = set()
+    ordered:list[Node] = []
+    for root in nodes:
+        if root in seen:
+            continue
+        seen.add(root)
+        ordered.append(root)
+        position = len(ordered) - 1
+        while position < len(ordered):
+            for neighbor in undirected[ordered[position]]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    ordered.append(neighbor)
+            position += 1
+
+    return ordered
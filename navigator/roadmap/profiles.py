@@ -0,0 +1,184 @@
+import math
+import numpy as np
+from navigator.roadmap.edge_factory import EdgeFactory
+from navigator.roadmap.types import NodeAndEdgeDataDict
+
+class VehicleProfile:
+    """
+    Describes how a kind of vehicle experiences the roads: which road
+    types it may use, how fast it can go, how long it waits at stops and
+    which roads it would rather avoid.
+
+    `cost` prices a single road the way `RoadMap.road_cost` always has,
+    and `cost_array` prices every road of a graph at once.  Both give the
+    same numbers.
+
+    Profiles only choose among the roads of the car network: maps are
+    extracted with pyrosm's "driving" network and only highway values in
+    `EdgeFactory.HIGHWAY_DRIVABLE` become priced roads.  `road_types` can
+    narrow that set but can't add to it, so e.g. an e-bike can't be
+    allowed onto a cycleway.
+    """
+    name:str
+    road_types:set[str] | None
+    max_speed:float
+    min_speed:float
+    vehicle_length:float
+    spacing:int
+    stop_minutes_per_vehicle:float
+    min_stop_minutes:float
+    signal_minutes:float
+    crossing_minutes:float
+    preferred_lanes:int
+    lane_penalty:float
+
+    def __init__(self,
+        name:str,
+        road_types:set[str] | None = None,
+        max_speed:float = math.inf,
+        min_speed:float = 15,
+        vehicle_length:float = 0.0036,
+        spacing:int = 3,
+        stop_minutes_per_vehicle:float = 2,
+        min_stop_minutes:float = 1,
+        signal_minutes:float = 5,
+        crossing_minutes:float = 1,
+        preferred_lanes:int = 1,
+        lane_penalty:float = 0.0
+    ) -> None:
+        self.name = name
+        # None allows every road type of the car network
+        self.road_types = road_types
+        # speeds are in mph
+        self.max_speed = max_speed
+        self.min_speed = min_speed
+        # in miles, vehicles are assumed to queue `spacing` lengths apart
+        self.vehicle_length = vehicle_length
+        self.spacing = spacing
+        self.stop_minutes_per_vehicle = stop_minutes_per_vehicle
+        self.min_stop_minutes = min_stop_minutes
+        self.signal_minutes = signal_minutes
+        self.crossing_minutes = crossing_minutes
+        # travel time grows by `lane_penalty` for every lane a road has
+        # fewer than `preferred_lanes`
+        self.preferred_lanes = preferred_lanes
+        self.lane_penalty = lane_penalty
+
+    def __repr__(self) -> str:
+        return f"VehicleProfile(name: {self.name})"
+
+    def cost(self, data:NodeAndEdgeDataDict) -> float:
+        """
+        The time in hours to drive a road and arrive at its end node.
+        """
+        # NodeAndEdgeDataDict must be queried with get(name, default)
+        # since some nodes or edges might not include certain data
+        cost:float = 0.0
+        causes_stops:bool = data.get('causes_stops', False)
+        lanes:int = data.get('lanes', 1) if data.get('lanes', 1) else 1
+        length:float|int = data.get('length', 9999999.0)
+        speed_limit:int = data.get('speed_limit', 25)
+        road_type:str = data.get('road_type', "unknown")
+
+        if self.road_types is not None and road_type not in self.road_types:
+            return math.inf
+
+        # This would in a non-emulation come from real time traffic data:
+        # But in this case we will assume every vehicle is `vehicle_length` long
+        # and spaced `spacing` vehicle lengths apart per road
+        number_of_cars_on_road = max(int(length / self.vehicle_length) // self.spacing, 1)
+
+        # Try to predict time on the road in hours
+        pred = speed_limit - (number_of_cars_on_road - 1) / number_of_cars_on_road * speed_limit
+        cost += length / min(max(pred, self.min_speed), speed_limit, self.max_speed)
+        if lanes < self.preferred_lanes:
+            cost *= 1 + self.lane_penalty * (self.preferred_lanes - lanes)
+        if causes_stops:
+            cost += max(self.min_stop_minutes, self.stop_minutes_per_vehicle * number_of_cars_on_road)/60
+        match road_type:
+            case "stop":
+                cost += max(self.min_stop_minutes, self.stop_minutes_per_vehicle * number_of_cars_on_road) /60
+            case "traffic_signals":
+                cost += self.signal_minutes/60
+            case "crossing":
+                cost += self.crossing_minutes/60
+        return cost
+
+    def cost_array(self, attributes:dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Vectorized `cost` over the columns built by `road_attributes`.
+        """
+        length = attributes['length']
+        speed_limit = attributes['speed_limit']
+        lanes = attributes['lanes']
+        road_type = attributes['road_type']
+
+        number_of_cars_on_road = np.maximum((length / self.vehicle_length).astype(np.int64) // self.spacing, 1)
+
+        pred = speed_limit - (number_of_cars_on_road - 1) / number_of_cars_on_road * speed_limit
+        speed = np.minimum(np.minimum(np.maximum(pred, self.min_speed), speed_limit), self.max_speed)
+        cost = length / speed
+        short_of_lanes = lanes < self.preferred_lanes
+        cost[short_of_lanes] *= 1 + self.lane_penalty * (self.preferred_lanes - lanes[short_of_lanes])
+
+        stop_cost = np.maximum(self.min_stop_minutes, self.stop_minutes_per_vehicle * number_of_cars_on_road) / 60
+        causes_stops = attributes['causes_stops']
+        cost[causes_stops] += stop_cost[causes_stops]
+        is_stop = road_type == "stop"
+        cost[is_stop] += stop_cost[is_stop]
+        cost[road_type == "traffic_signals"] += self.signal_minutes/60
+        cost[road_type == "crossing"] += self.crossing_minutes/60
+
+        if self.road_types is not None:
+            cost[~np.isin(road_type, list(self.road_types))] = math.inf
+
+        return cost
+
+    @staticmethod
+    def road_attributes(data:list[NodeAndEdgeDataDict]) -> dict[str, np.ndarray]:
+        """
+        Turns the merged edge and end node data of many roads into the
+        columns `cost_array` reads, filling in the same defaults as `cost`.
+        """
+        return {
+            'length': np.array([item.get('length', 9999999.0) for item in data], dtype=np.float64),
+            'speed_limit': np.array([item.get('speed_limit', 25) for item in data], dtype=np.float64),
+            'lanes': np.array([item.get('lanes', 1) if item.get('lanes', 1) else 1 for item in data], dtype=np.int64),
+            'causes_stops': np.array([bool(item.get('causes_stops', False)) for item in data], dtype=np.bool_),
+            'road_type': np.array([item.get('road_type', "unknown") for item in data], dtype=object),
+        }
+
+
+# The car every road cost was tuned for: an average Ford F150 (0.0036 miles long)
+# spaced 2 F150s apart, never slower than 15 mph.
+CAR = VehicleProfile("car")
+
+BOX_TRUCK = VehicleProfile(
+    "box_truck",
+    road_types=EdgeFactory.HIGHWAY_DRIVABLE - {"living_street"},
+    max_speed=55,
+    min_speed=10,
+    vehicle_length=0.0057,
+    stop_minutes_per_vehicle=3,
+    min_stop_minutes=1.5,
+    signal_minutes=6,
+    crossing_minutes=1.5,
+    preferred_lanes=2,
+    lane_penalty=0.25
+)
+
+E_BIKE = VehicleProfile(
+    "e_bike",
+    road_types=EdgeFactory.HIGHWAY_DRIVABLE - {"motorway", "motorway_link", "trunk", "trunk_link"},
+    max_speed=20,
+    min_speed=10,
+    vehicle_length=0.0011,
+    stop_minutes_per_vehicle=0.5,
+    min_stop_minutes=0.5,
+    signal_minutes=3,
+    crossing_minutes=0.5,
+    preferred_lanes=1,
+    lane_penalty=0.0
+)
+
+PROFILES = {profile.name: profile for profile in (CAR, BOX_TRUCK, E_BIKE)}
@@ -1,12 +1,26 @@
+from __future__ import annotations
 import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable
 from navigator.roadmap.edge import Edge
 from navigator.roadmap.node import Node
-import heapq
 
+import numpy as np
+from navigator.roadmap.budget import DEADLINES, BudgetExceeded, SearchBudget
+from navigator.roadmap.components import strongly_connected_components, weakly_connected_components
+from navigator.roadmap.edge_types import ChainRoad
+from navigator.roadmap.frontier import Frontier, HeapFrontier
 from navigator.roadmap.node_types import RoadNode
+from navigator.roadmap.profiles import CAR, VehicleProfile
 from navigator.roadmap.types import NodeAndEdgeDataDict
-from PIL import Image, ImageDraw
-from scipy.spatial import KDTree
+
+# scipy, PIL, numba and shapely's geometry helpers are imported where they
+# are first used so that loading a graph for routing stays cheap
+if TYPE_CHECKING:
+    from scipy.spatial import KDTree
+    from shapely.geometry.base import BaseGeometry
 
 EARTHS_RADIUS = 6378137
 METERS_PER_MILE = 1609.344
@@ -18,12 +32,73 @@ class RoadMap:
     """
     nodes:list[Node]
     edges:list[Edge]
-    node_kd_tree:KDTree
+    node_lonlat:np.ndarray
+    node_xy:np.ndarray
+    core_component:int
+    core_nodes:list[Node]
+    profile_costs:dict[VehicleProfile, np.ndarray]
+    profile_road_costs:dict[VehicleProfile, np.ndarray]
+    profile_components:dict[VehicleProfile, tuple[np.ndarray, np.ndarray, np.ndarray]]
+    _profile_core_kd_trees:dict[VehicleProfile, KDTree]
+    _profile_cost_lists:dict[VehicleProfile, list[float]]
+    csr_edges:list[Edge]
+    _csr:tuple[np.ndarray, np.ndarray] | None
+    _csr_edge_indices:np.ndarray | None
+    _csr_costs:dict[VehicleProfile, np.ndarray]
+    facility_sets:dict[str, list[Node]]
 
     def __init__(self, nodes:list[Node], edges:list[Edge]) -> None:
         self.nodes = nodes
-        self.edges = edges
-        self.node_kd_tree = KDTree([self.lonlat_to_mercator(node.x, node.y) for node in nodes])
+        self.edges = list(edges)
+        for index, node in enumerate(nodes):
+            node.index = index
+        for index, edge in enumerate(self.edges):
+            edge.index = index
+        # every edge the searches can take needs a slot in the cost arrays
+        for node in nodes:
+            for edge in node.edges:
+                if not (0 <= edge.index < len(self.edges) and self.edges[edge.index] is edge):
+                    edge.index = len(self.edges)
+                    self.edges.append(edge)
+        self.node_lonlat = np.array([(node.x, node.y) for node in nodes], dtype=np.float64).reshape(-1, 2)
+        self.node_xy = np.array([self.lonlat_to_mercator(node.x, node.y) for node in nodes], dtype=np.float64).reshape(-1, 2)
+
+        # the largest strongly connected component is the routable core,
+        # every node in it can reach every other node in it
+        component_sizes = Counter(node.component for node in nodes)
+        self.core_component = component_sizes.most_common(1)[0][0] if component_sizes else 0
+        self.core_nodes = [node for node in nodes if node.component == self.core_component]
+
+        self.profile_costs = {}
+        self.profile_road_costs = {}
+        self.profile_components = {}
+        self._profile_core_kd_trees = {}
+        self._profile_cost_lists = {}
+
+        self.csr_edges = []
+        self._csr = None
+        self._csr_edge_indices = None
+        self._csr_costs = {}
+
+        self.facility_sets = {}
+
+        # incoming edges let searches run backwards from a destination
+        for node in nodes:
+            node.in_edges = []
+        for node in nodes:
+            for edge in node.edges:
+                if edge.end:
+                    edge.end.in_edges.append(edge)
+
+    @cached_property
+    def node_kd_tree(self) -> KDTree:
+        from scipy.spatial import KDTree
+        return KDTree(self.node_xy)
+
+    @cached_property
+    def core_kd_tree(self) -> KDTree:
+        from scipy.spatial import KDTree
+        return KDTree(self.node_xy[[node.index for node in self.core_nodes]])
 
     @staticmethod
     def lonlat_to_mercator(lon:float, lat:float):
@@ -37,46 +112,175 @@ class RoadMap:
         lat = math.degrees(2 * math.atan(math.exp(y * METERS_PER_MILE / EARTHS_RADIUS)) - math.pi/2)
         return lon, lat
 
-    def find_node(self, x:float, y:float) -> None | Node:
+    def find_node(self, x:float, y:float, core_only:bool = True, profile:VehicleProfile = CAR) -> None | Node:
+        """
+        Snaps a mercator coordinate to the nearest node.
+
+        By default only nodes of the routable core of `profile` are
+        considered so the result can always be routed to and from.
+        """
+        if core_only and profile.road_types is not None:
+            # profiles limited to some road types have a core of their own
+            dist, idx = self._profile_core_kd_tree(profile).query((x, y))
+            return self.nodes[self.components_for(profile)[2][idx]]
+        if core_only:
+            dist, idx = self.core_kd_tree.query((x, y))
+            return self.core_nodes[idx]
         dist, idx = self.node_kd_tree.query((x, y))
         return self.nodes[idx]
+
+    def _profile_core_kd_tree(self, profile:VehicleProfile) -> KDTree:
+        tree = self._profile_core_kd_trees.get(profile)
+        if tree is None:
+            from scipy.spatial import KDTree
+            tree = KDTree(self.node_xy[self.components_for(profile)[2]])
+            self._profile_core_kd_trees[profile] = tree
+        return tree
+
+    def prepare(self, profile:VehicleProfile = CAR) -> None:
+        """
+        Builds everything a query for `profile` needs up front: its edge
+        costs and, for profiles limited to some road types, its components
+        and the KD-tree of its routable core.  After this, the first query
+        for the profile costs no more than the ones after it.
+
+        Everything is kept per profile instance, so profiles should be
+        built once and reused; building a new `VehicleProfile` for every
+        request grows these caches without bound.
+        """
+        self.edge_costs(profile)
+        if profile.road_types is None:
+            self.core_kd_tree
+        else:
+            self._profile_core_kd_tree(profile)
+
+    def components_for(self, profile:VehicleProfile) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The strongly and weakly connected component id of every node over
+        the roads `profile` may use, and the node indices of that
+        profile's routable core.  Computed by `prepare` or the first time
+        a profile with `road_types` asks, and kept from then on per
+        profile instance; profiles without them see the same components
+        as the tags on the nodes.
+
+        :return: `(component, weak_component, core_indices)`
+        """
+        components = self.profile_components.get(profile)
+        if components is None:
+            edge_costs = self._edge_cost_list(profile)
+
+            def usable_neighbors(node:Node) -> list[Node]:
+                return [edge.end for edge in node.edges if edge.end and edge_costs[edge.index] != math.inf]
+
+            strong = np.zeros(len(self.nodes), dtype=np.int64)
+            for component_id, component in enumerate(strongly_connected_components(self.nodes, usable_neighbors)):
+                strong[[node.index for node in component]] = component_id
+            weak = np.zeros(len(self.nodes), dtype=np.int64)
+            for component_id, component in enumerate(weakly_connected_components(self.nodes, usable_neighbors)):
+                weak[[node.index for node in component]] = component_id
+
+            core_component = int(np.bincount(strong).argmax()) if len(strong) else 0
+            components = (strong, weak, np.flatnonzero(strong == core_component))
+            self.profile_components[profile] = components
+        return components
+
+    def unreachable(self, start:Node, destination:Node, profile:VehicleProfile = CAR) -> bool:
+        """
+        Tells in O(1) whether the component tags rule out any path from
+        start to destination for `profile`.
+
+        Strongly connected component ids follow reverse topological order,
+        so a road can never lead to a component with a higher id.
+        """
+        if profile.road_types is None:
+            return start.weak_component != destination.weak_component or start.component < destination.component
+        strong, weak, _ = self.components_for(profile)
+        return bool(weak[start.index] != weak[destination.index] or strong[start.index] < strong[destination.index])
             
 
-    def road_cost(self, data:NodeAndEdgeDataDict) -> float:
-        """
-        The current road cost.
-        """
-        # NodeAndEdgeDataDict must be queried with get(name, default)
-        # since some nodes or edges might not include certain data
-        cost:float = 0.0
-        causes_stops:bool = data.get('causes_stops', False)
-        connections:int = data.get('connections', 1)
-        dead_end:bool = data.get('dead_end', False)
-        lanes:int = data.get('lanes', 1) if data.get('lanes', 1) else 1
-        length:float|int = data.get('length', 9999999.0)
-        speed_limit:int = data.get('speed_limit', 25)
-        oneway:bool = data.get('oneway', True)
-        road_type:str = data.get('road_type', "unknown")
-
-        # This would in a non-emulation come from real time traffic data:
-        # But in this case we will assume every car is the average length of a Ford F150
-        # and assume the cars are all spaced 2 Ford F150s apart per road
-        ford_f150_len = 0.0036 # Length of a ford f150 in miles
-        number_of_cars_on_road = max(int(length / ford_f150_len) // 3, 1)
-
-        # Try to predict time on the road in hours
-        pred = speed_limit - (number_of_cars_on_road - 1) / number_of_cars_on_road * speed_limit
-        cost += length / min(max(pred, 15), speed_limit)
-        if causes_stops:
-            cost += max(1, 2 * number_of_cars_on_road)/60
-        match road_type:
-            case "stop":
-                cost += max(1, 2 * number_of_cars_on_road) /60
-            case "traffic_signals":
-                cost += 5/60
-            case "crossing":
-                cost += 1/60
-        return cost
+    def road_cost(self, data:NodeAndEdgeDataDict, profile:VehicleProfile = CAR) -> float:
+        """
+        The current road cost for a vehicle `profile`.
+        """
+        return profile.cost(data)
+
+    def edge_cost(self, edge:Edge, profile:VehicleProfile = CAR) -> float:
+        """
+        The cost of driving along `edge` and arriving at its end node.
+        """
+        if isinstance(edge, ChainRoad):
+            return sum(self.edge_cost(segment, profile) for segment in edge.segments)
+        return self.road_cost(edge.data | edge.end.data, profile) # type: ignore
+
+    @cached_property
+    def road_attributes(self) -> dict[str, np.ndarray]:
+        """
+        The attributes `VehicleProfile.cost_array` reads for every original
+        road.  Roads are laid out edge by edge, with a `ChainRoad`
+        contributing all of its segments, and `segment_offsets[i]` is
+        where the roads of `self.edges[i]` start.
+        """
+        data:list[NodeAndEdgeDataDict] = []
+        offsets = np.zeros(len(self.edges), dtype=np.int64)
+        for edge in self.edges:
+            offsets[edge.index] = len(data)
+            for segment in (edge.segments if isinstance(edge, ChainRoad) else [edge]):
+                data.append(segment.data | segment.end.data if segment.end else segment.data) # type: ignore
+
+        attributes = VehicleProfile.road_attributes(data)
+        attributes['segment_offsets'] = offsets
+        return attributes
+
+    @cached_property
+    def road_slots(self) -> dict[Edge, int]:
+        """
+        Where every original road, chain segments included, sits in the
+        `road_attributes` layout, so the roads of an expanded path can
+        find their cost in `road_costs`.
+        """
+        offsets = self.road_attributes['segment_offsets']
+        slots:dict[Edge, int] = {}
+        for edge in self.edges:
+            for position, segment in enumerate(edge.segments if isinstance(edge, ChainRoad) else [edge]):
+                slots[segment] = int(offsets[edge.index]) + position
+        return slots
+
+    def road_costs(self, profile:VehicleProfile = CAR) -> np.ndarray:
+        """
+        The cost of every original road for `profile`, in the
+        `road_attributes` layout.  `road_slots` maps a road to its cost.
+        """
+        costs = self.profile_road_costs.get(profile)
+        if costs is None:
+            costs = profile.cost_array(self.road_attributes)
+            self.profile_road_costs[profile] = costs
+        return costs
+
+    def edge_costs(self, profile:VehicleProfile = CAR) -> np.ndarray:
+        """
+        The cost of every edge in `self.edges` for `profile`, computed in
+        one vectorized pass by `prepare` or the first time a profile is
+        used, and kept from then on per profile instance.  Roads the
+        profile may not use cost `math.inf`.
+        """
+        costs = self.profile_costs.get(profile)
+        if costs is None:
+            segment_costs = self.road_costs(profile)
+            offsets = self.road_attributes['segment_offsets']
+            segment_counts = np.diff(offsets, append=len(segment_costs))
+            costs = segment_costs[offsets]
+            # add chain segments in order so the sums match `edge_cost` exactly
+            for position in range(1, int(segment_counts.max(initial=1))):
+                longer = segment_counts > position
+                costs[longer] += segment_costs[offsets[longer] + position]
+            self.profile_costs[profile] = costs
+            self._profile_cost_lists[profile] = costs.tolist()
+        return costs
+
+    def _edge_cost_list(self, profile:VehicleProfile) -> list[float]:
+        # plain floats are quicker than numpy scalars in the python searches
+        self.edge_costs(profile)
+        return self._profile_cost_lists[profile]
     
     @staticmethod
     def euclidian_distance(x1:float, y1:float, x2:float, y2:float) -> float:
@@ -90,20 +294,32 @@ class RoadMap:
         
         return distance / max(average_speed_limit, 15)
 
-    def a_star_find_path(self, start:Node, destination:Node) -> list[Node|Edge]|None:
+    def a_star_find_path(self, start:Node, destination:Node,
+    frontier_type:Callable[[], Frontier] = HeapFrontier, profile:VehicleProfile = CAR,
+    budget:SearchBudget | None = None) -> list[Node|Edge]|None:
         """
         Performs A* graph traversal to find the (hopefully) best
         rout from a start point to a destination.
+
+        `frontier_type` builds the priority queue used for the frontier
+        and `profile` is the vehicle the roads are priced for.  A `budget`
+        stops the search early by raising `BudgetExceeded`.
         
         :return: A path list of junctions and roads.
         :rtype: list[Node | Edge]
         """
+        if self.unreachable(start, destination, profile):
+            return None
+
         path_cost_lookup: dict[Node, float] = {start: 0.0}
 
         came_from_lookup: dict[Node, tuple[Edge | None, Node | None]] = {
             start: (None, None)
         }
 
+        edge_costs = self._edge_cost_list(profile)
+        deadline = budget.deadline() if budget is not None else math.inf
+
         # Calculating a running average of all of the roads speed limit which we have traveled on
         # The next road probably wont be much different.
         cumulative_speed_limit = 0.0
@@ -120,17 +336,15 @@ class RoadMap:
         cumulative_roads += 1
             
                 
-        counter = 0
-        frontier:list[tuple[float, int, Node]] = []
-        heapq.heappush(frontier, (self.heuristic(start, destination, cumulative_speed_limit/cumulative_roads, cumulative_lanes/cumulative_roads), counter, start)) # type: ignore
-        counter += 1
+        frontier = frontier_type()
+        frontier.push(self.heuristic(start, destination, cumulative_speed_limit/cumulative_roads, cumulative_lanes/cumulative_roads), start)
 
         
 
         explored:set[Node] = set()
 
         while frontier:
-            _, _, current_node = heapq.heappop(frontier)
+            _, current_node = frontier.pop()
 
             if current_node in explored:
                 continue
@@ -138,6 +352,11 @@ class RoadMap:
             if current_node == destination:
                 return self._reconstruct_path(came_from_lookup, destination)
 
+            if budget is not None:
+                reason = budget.exceeded(len(explored), path_cost_lookup[current_node], deadline)
+                if reason is not None:
+                    raise BudgetExceeded(reason, self._partial_path(came_from_lookup, explored, destination) if budget.partial_path else None)
+
             explored.add(current_node)
 
             for road in current_node.edges:
@@ -147,7 +366,11 @@ class RoadMap:
                 if road.end in explored:
                     continue
 
-                path_cost = path_cost_lookup[current_node] + self.road_cost(road.data | road.end.data)
+                road_cost = edge_costs[road.index]
+                if road_cost == math.inf:
+                    continue
+
+                path_cost = path_cost_lookup[current_node] + road_cost
                 
 
                 if road.end not in path_cost_lookup or path_cost < path_cost_lookup[road.end]:
@@ -156,34 +379,43 @@ class RoadMap:
                     cumulative_roads += 1
                     path_cost_lookup[road.end] = path_cost
                     came_from_lookup[road.end] = (road, current_node)
-                    heapq.heappush(frontier, (path_cost + self.heuristic(road.end, destination, cumulative_speed_limit/cumulative_roads, cumulative_lanes/cumulative_roads), counter, road.end))
-                    counter += 1
+                    frontier.push(path_cost + self.heuristic(road.end, destination, cumulative_speed_limit/cumulative_roads, cumulative_lanes/cumulative_roads), road.end)
 
         return None
     
-    def ucs_find_path(self, start:Node, destination:Node) -> list[Node|Edge]|None:
+    def ucs_find_path(self, start:Node, destination:Node,
+    frontier_type:Callable[[], Frontier] = HeapFrontier, profile:VehicleProfile = CAR,
+    budget:SearchBudget | None = None) -> list[Node|Edge]|None:
         """
         Performs UCS graph traversal to find the (hopefully) best
         rout from a start point to a destination.
+
+        `frontier_type` builds the priority queue used for the frontier
+        and `profile` is the vehicle the roads are priced for.  A `budget`
+        stops the search early by raising `BudgetExceeded`.
         
         :return: A path list of junctions and roads.
         :rtype: list[Node | Edge]
         """
+        if self.unreachable(start, destination, profile):
+            return None
+
         path_cost_lookup: dict[Node, float] = {start: 0.0}
 
         came_from_lookup: dict[Node, tuple[Edge | None, Node | None]] = {
             start: (None, None)
         }
+
+        edge_costs = self._edge_cost_list(profile)
+        deadline = budget.deadline() if budget is not None else math.inf
                 
-        counter = 0
-        frontier:list[tuple[float, int, Node]] = []
-        heapq.heappush(frontier, (0.0, counter, start)) # type: ignore
-        counter += 1
+        frontier = frontier_type()
+        frontier.push(0.0, start)
 
         explored:set[Node] = set()
 
         while frontier:
-            _, _, current_node = heapq.heappop(frontier)
+            _, current_node = frontier.pop()
 
             if current_node in explored:
                 continue
@@ -191,6 +423,11 @@ class RoadMap:
             if current_node == destination:
                 return self._reconstruct_path(came_from_lookup, destination)
 
+            if budget is not None:
+                reason = budget.exceeded(len(explored), path_cost_lookup[current_node], deadline)
+                if reason is not None:
+                    raise BudgetExceeded(reason, self._partial_path(came_from_lookup, explored, destination) if budget.partial_path else None)
+
             explored.add(current_node)
 
             for road in current_node.edges:
@@ -200,18 +437,429 @@ class RoadMap:
                 if road.end in explored:
                     continue
 
-                path_cost = path_cost_lookup[current_node] + self.road_cost(road.data | road.end.data)
+                road_cost = edge_costs[road.index]
+                if road_cost == math.inf:
+                    continue
+
+                path_cost = path_cost_lookup[current_node] + road_cost
                 
 
                 if road.end not in path_cost_lookup or path_cost < path_cost_lookup[road.end]:
                     path_cost_lookup[road.end] = path_cost
                     came_from_lookup[road.end] = (road, current_node)
-                    heapq.heappush(frontier, (path_cost, counter, road.end))
-                    counter += 1
+                    frontier.push(path_cost, road.end)
 
         return None
 
-    def _reconstruct_path(self, came_from_lookup: dict[Node, tuple[Edge | None, Node | None]], end: Node):
+    def _shortest_path_tree(self, root:Node, reverse:bool = False, cost_limit:float = math.inf,
+    target:Node | None = None, stretch:float = 1.0, stop_after:Callable[[Node], bool] | None = None,
+    frontier_type:Callable[[], Frontier] = HeapFrontier, profile:VehicleProfile = CAR) -> tuple[dict[Node, float], dict[Node, tuple[Edge | None, Node | None]]]:
+        """
+        Runs Dijkstra from `root` and keeps the whole search tree.
+
+        With `reverse` the search follows incoming edges, so costs are
+        the cost of driving *to* `root` and each lookup entry points at the
+        next node on the way there.  The search stops once it passes
+        `cost_limit`, or `stretch` times the cost of `target` once the
+        target has been settled, or as soon as `stop_after` returns True
+        for a settled node.
+
+        :return: The settled costs and the came from lookup of the tree.
+        """
+        settled:dict[Node, float] = {}
+        path_cost_lookup:dict[Node, float] = {root: 0.0}
+        came_from_lookup:dict[Node, tuple[Edge | None, Node | None]] = {
+            root: (None, None)
+        }
+
+        edge_costs = self._edge_cost_list(profile)
+
+        frontier = frontier_type()
+        frontier.push(0.0, root)
+
+        while frontier:
+            cost, current_node = frontier.pop()
+
+            if current_node in settled:
+                continue
+
+            if cost > cost_limit:
+                break
+
+            settled[current_node] = cost
+
+            if current_node is target:
+                cost_limit = min(cost_limit, cost * stretch)
+
+            if stop_after is not None and stop_after(current_node):
+                break
+
+            for road in (current_node.in_edges if reverse else current_node.edges):
+                neighbor = road.start if reverse else road.end
+                if not neighbor or not road.end:
+                    continue
+
+                if neighbor in settled:
+                    continue
+
+                road_cost = edge_costs[road.index]
+                if road_cost == math.inf:
+                    continue
+
+                path_cost = cost + road_cost
+
+                if neighbor not in path_cost_lookup or path_cost < path_cost_lookup[neighbor]:
+                    path_cost_lookup[neighbor] = path_cost
+                    came_from_lookup[neighbor] = (road, current_node)
+                    frontier.push(path_cost, neighbor)
+
+        return settled, came_from_lookup
+
+    def find_alternative_paths(self, start:Node, destination:Node, k:int = 3, max_stretch:float = 1.4,
+    max_overlap:float = 0.7, min_plateau:float = 0.2, profile:VehicleProfile = CAR) -> list[tuple[list[Node|Edge], float, float]]:
+        """
+        Finds up to `k` distinct routes from start to destination using the
+        plateau method.
+
+        One forward tree from the start and one backward tree from the
+        destination are grown once and shared by every candidate.  Roads
+        that lie on both trees form "plateaus", and every plateau yields a
+        candidate route: start -> plateau -> destination.  Candidates are
+        rejected when they take more than `max_stretch` times the fastest
+        route, when their plateau covers less than `min_plateau` of the
+        route, or when more than `max_overlap` of their cost is shared
+        with a route that was already picked.
+
+        :return: The routes ranked fastest first as
+            `(path, time_estimate, overlap)` tuples, where overlap is the
+            share of the route's cost spent on roads of higher ranked routes.
+        :rtype: list[tuple[list[Node | Edge], float, float]]
+        """
+        if self.unreachable(start, destination, profile):
+            return []
+
+        forward_costs, forward_came_from = self._shortest_path_tree(start, target=destination, stretch=max_stretch, profile=profile)
+        if destination not in forward_costs:
+            return []
+
+        best_cost = forward_costs[destination]
+        backward_costs, backward_came_from = self._shortest_path_tree(destination, reverse=True, cost_limit=best_cost * max_stretch, profile=profile)
+
+        # each plateau is only looked at through the node it starts on
+        candidates:list[tuple[float, int, Node]] = []
+        for node, forward_cost in forward_costs.items():
+            if node not in backward_costs:
+                continue
+            via_cost = forward_cost + backward_costs[node]
+            if via_cost > best_cost * max_stretch:
+                continue
+            road, prev = forward_came_from[node]
+            if prev is not None and prev in backward_costs and backward_came_from[prev][0] is road:
+                continue
+            candidates.append((via_cost, len(candidates), node))
+        candidates.sort()
+
+        routes:list[tuple[list[Node|Edge], float, float]] = []
+        used_roads:set[Edge] = set()
+        edge_costs = self._edge_cost_list(profile)
+
+        for via_cost, _, via in candidates:
+            if len(routes) >= k:
+                break
+
+            # walk the plateau to see how much of the route both trees agree on
+            plateau_end = via
+            while plateau_end is not destination:
+                road, next_node = backward_came_from[plateau_end]
+                if next_node not in forward_costs or forward_came_from[next_node][0] is not road:
+                    break
+                plateau_end = next_node
+            plateau_cost = forward_costs[plateau_end] - forward_costs[via]
+            if routes and plateau_cost < min_plateau * via_cost:
+                continue
+
+            # overlap is measured on routing edges, chains are only expanded for the result
+            path = self._reconstruct_path(forward_came_from, via, expand=False)
+            current = via
+            while current is not destination:
+                road, next_node = backward_came_from[current]
+                path.append(road) # type: ignore
+                path.append(next_node) # type: ignore
+                current = next_node # type: ignore
+
+            route_roads = [item for item in path if isinstance(item, Edge)]
+            shared_cost = sum(edge_costs[road.index] for road in route_roads if road in used_roads)
+            overlap = shared_cost / via_cost if via_cost > 0 else 0.0
+            if routes and overlap > max_overlap:
+                continue
+
+            used_roads.update(route_roads)
+            path = self.expand_path(path)
+            routes.append((path, self.get_path_time_estimate(path, profile), overlap))
+
+        return routes
+
+    def register_facilities(self, name:str, points:list[tuple[float, float]],
+    profile:VehicleProfile = CAR) -> list[Node]:
+        """
+        Snaps a set of facilities, given as mercator `(x, y)` points like
+        `find_node` takes, to the routable core of `profile` and keeps
+        them under `name`.
+        A facility's index in `points` is its id in nearest facility results.
+
+        :return: The node every facility was snapped to.
+        :rtype: list[Node]
+        """
+        snapped:list[Node] = []
+        for x, y in points:
+            node = self.find_node(x, y, profile=profile)
+            if node is None:
+                raise RuntimeError(f"Failed to snap facility at {(x, y)!r} to the road map!")
+            snapped.append(node)
+
+        self.facility_sets[name] = snapped
+        return snapped
+
+    def nearest_facilities(self, target:Node, name:str, k:int = 1, cost_limit:float = math.inf,
+    profile:VehicleProfile = CAR) -> list[tuple[int, list[Node|Edge], float]]:
+        """
+        Finds the `k` facilities of a registered set that can drive to
+        `target` the fastest.
+
+        A single Dijkstra runs backwards from the target over incoming
+        roads and stops once `k` facilities have been settled, or once it
+        passes `cost_limit` hours.  Facilities the component tags prove
+        unable to reach the target are left out before searching.  The
+        tags can't prove a facility *can* reach it, so when fewer than `k`
+        of the rest do, the search settles every node that can reach the
+        target; a `cost_limit` bounds that.
+
+        :return: Up to `k` `(facility_id, path, time_estimate)` tuples,
+            fastest first, with each path leading from the facility to
+            the target.
+        :rtype: list[tuple[int, list[Node | Edge], float]]
+        """
+        facilities_at:dict[Node, list[int]] = {}
+        for facility_id, node in enumerate(self.facility_sets[name]):
+            if not self.unreachable(node, target, profile):
+                facilities_at.setdefault(node, []).append(facility_id)
+
+        wanted = min(k, sum(len(ids) for ids in facilities_at.values()))
+        if wanted <= 0:
+            return []
+
+        found:list[tuple[int, Node]] = []
+
+        def collect(node:Node) -> bool:
+            for facility_id in facilities_at.get(node, ()):
+                found.append((facility_id, node))
+            return len(found) >= wanted
+
+        _, came_from_lookup = self._shortest_path_tree(target, reverse=True, cost_limit=cost_limit, stop_after=collect, profile=profile)
+
+        results:list[tuple[int, list[Node|Edge], float]] = []
+        for facility_id, node in found[:wanted]:
+            path:list[Node|Edge] = [node]
+            current = node
+            while current is not target:
+                road, next_node = came_from_lookup[current]
+                path.append(road) # type: ignore
+                path.append(next_node) # type: ignore
+                current = next_node # type: ignore
+
+            path = self.expand_path(path)
+            results.append((facility_id, path, self.get_path_time_estimate(path, profile)))
+
+        return results
+
+    def nearest_facilities_many(self, targets:list[Node], name:str, k:int = 1, cost_limit:float = math.inf,
+    profile:VehicleProfile = CAR) -> list[list[tuple[int, list[Node|Edge], float]]]:
+        """
+        `nearest_facilities` for many targets, one backward search each.
+        This is a convenience loop: the searches share no work and run
+        one after another.
+        """
+        return [self.nearest_facilities(target, name, k, cost_limit, profile) for target in targets]
+
+    def to_csr(self, profile:VehicleProfile = CAR) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Exports the routing graph as compressed sparse rows.
+
+        The outgoing edges of node `i` sit in slots
+        `indptr[i]:indptr[i + 1]`, with `targets` holding the index of
+        each edge's end node and `costs` its cost for `profile`.
+        `csr_edges` maps every slot back to its `Edge`.  The adjacency is
+        shared by every profile.
+
+        :return: `(indptr, targets, costs)`
+        """
+        if self._csr is None:
+            indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+            targets:list[int] = []
+            self.csr_edges = []
+            for node in self.nodes:
+                for edge in node.edges:
+                    if not edge.end:
+                        continue
+                    targets.append(edge.end.index)
+                    self.csr_edges.append(edge)
+                indptr[node.index + 1] = len(targets)
+            self._csr = (indptr, np.array(targets, dtype=np.int64))
+            self._csr_edge_indices = np.array([edge.index for edge in self.csr_edges], dtype=np.int64)
+
+        costs = self._csr_costs.get(profile)
+        if costs is None:
+            costs = self.edge_costs(profile)[self._csr_edge_indices]
+            self._csr_costs[profile] = costs
+
+        indptr, targets = self._csr
+        return indptr, targets, costs
+
+    def csr_find_path(self, start:Node, destination:Node, heuristic_speed:float | None = None,
+    profile:VehicleProfile = CAR, budget:SearchBudget | None = None) -> list[Node|Edge]|None:
+        """
+        Finds a path with the array search kernel over `to_csr`.
+
+        The kernel is compiled with numba when it is installed and runs as
+        plain Python otherwise; both give identical paths.  Without a
+        `heuristic_speed` (mph) it is Dijkstra and finds the same cost as
+        `ucs_find_path`; with one it is A* using the straight line
+        distance at that speed, which stays admissible as long as no road
+        is faster.
+
+        A `budget` stops the search early by raising `BudgetExceeded`,
+        like it does for `a_star_find_path`.  The kernel can't read the
+        clock, so the deadline is a flag the shared `DEADLINES` watcher
+        thread raises and the kernel polls for every settled node.
+
+        :return: A path list of junctions and roads.
+        :rtype: list[Node | Edge]
+        """
+        if self.unreachable(start, destination, profile):
+            return None
+
+        from navigator.roadmap.kernel import STOP_REASONS, csr_search
+
+        indptr, targets, costs = self.to_csr(profile)
+        hours_per_mile = 1 / heuristic_speed if heuristic_speed else 0.0
+
+        max_settled = -1
+        max_cost = math.inf
+        cancel_flag = np.zeros(1, dtype=np.uint8)
+        deadline_flag = np.zeros(1, dtype=np.uint8)
+        deadline_key:int | None = None
+        if budget is not None:
+            max_settled = budget.max_settled if budget.max_settled is not None else -1
+            max_cost = budget.max_cost
+            if budget.token is not None:
+                cancel_flag = budget.token.flag
+            if budget.timeout is not None:
+                deadline_key = DEADLINES.watch(budget.deadline(), deadline_flag)
+
+        try:
+            came_from, path_cost, stop_reason, closest = csr_search(
+                indptr, targets, costs, self.node_xy[:, 0], self.node_xy[:, 1],
+                start.index, destination.index, hours_per_mile,
+                max_settled, max_cost, cancel_flag, deadline_flag
+            )
+        finally:
+            if deadline_key is not None:
+                DEADLINES.release(deadline_key)
+
+        if stop_reason:
+            partial_path = self._csr_path(came_from, start, self.nodes[closest]) if budget is not None and budget.partial_path else None
+            raise BudgetExceeded(STOP_REASONS[stop_reason], partial_path)
+
+        if came_from[destination.index] < 0 and destination is not start:
+            return None
+
+        return self._csr_path(came_from, start, destination)
+
+    def _csr_path(self, came_from:np.ndarray, start:Node, end:Node) -> list[Node|Edge]:
+        """
+        Walks the kernel's came from slots back from `end` to `start`.
+        """
+        path:list[Node | Edge] = [end]
+        current = end.index
+        while current != start.index:
+            edge = self.csr_edges[came_from[current]]
+            path.append(edge)
+            path.append(edge.start) # type: ignore
+            current = edge.start.index # type: ignore
+
+        path.reverse()
+        return self.expand_path(path)
+
+    def csr_find_paths(self, queries:list[tuple[Node, Node]], heuristic_speed:float | None = None,
+    max_workers:int | None = None, profile:VehicleProfile = CAR,
+    budget:SearchBudget | None = None) -> list[list[Node|Edge]|BudgetExceeded|None]:
+        """
+        Runs `csr_find_path` for many `(start, destination)` pairs on a
+        thread pool.  The compiled kernel releases the GIL so the queries
+        run in parallel.
+
+        `budget` applies to every query on its own.  A query that runs out
+        of it gets its `BudgetExceeded` in place of a path, so one slow
+        query doesn't lose the answers of the others.
+        """
+        self.to_csr(profile)
+
+        def find(query:tuple[Node, Node]) -> list[Node|Edge]|BudgetExceeded|None:
+            try:
+                return self.csr_find_path(*query, heuristic_speed=heuristic_speed, profile=profile, budget=budget)
+            except BudgetExceeded as exceeded:
+                return exceeded
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(find, queries))
+
+    def reachable_within(self, start:Node, cost_limit:float, profile:VehicleProfile = CAR) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Bounded one-to-all Dijkstra from `start`.
+
+        `cost_limit` is in the same unit as `road_cost` (hours).
+
+        :return: The indices into `self.nodes` of every node reachable
+            within the cost limit and the cost of reaching each of them,
+            ordered by cost.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        settled, _ = self._shortest_path_tree(start, cost_limit=cost_limit, profile=profile)
+        indices = np.fromiter((node.index for node in settled), dtype=np.int64, count=len(settled))
+        costs = np.fromiter(settled.values(), dtype=np.float64, count=len(settled))
+        return indices, costs
+
+    def isochrones(self, start:Node, budgets:list[float], concavity:float = 0.3,
+    profile:VehicleProfile = CAR) -> list[tuple[float, BaseGeometry]]:
+        """
+        Builds a service area polygon for each of `budgets` (in hours)
+        from a single bounded search sized for the largest budget.
+
+        `concavity` is handed to `shapely.concave_hull`, where 1.0 gives
+        the convex hull and smaller values hug the reached nodes tighter.
+
+        :return: `(budget, polygon)` pairs in lon/lat, smallest budget first.
+        :rtype: list[tuple[float, BaseGeometry]]
+        """
+        import shapely
+
+        budgets = sorted(budgets)
+        if not budgets:
+            return []
+
+        indices, costs = self.reachable_within(start, budgets[-1], profile)
+        lonlat = self.node_lonlat[indices]
+
+        contours:list[tuple[float, BaseGeometry]] = []
+        for budget in budgets:
+            # costs come out of the search sorted, so every contour is a prefix
+            reached = int(np.searchsorted(costs, budget, side="right"))
+            points = shapely.multipoints(lonlat[:reached])
+            contours.append((budget, shapely.concave_hull(points, ratio=concavity)))
+
+        return contours
+
+    def _reconstruct_path(self, came_from_lookup: dict[Node, tuple[Edge | None, Node | None]], end: Node, expand:bool = True):
         path:list[Node | Edge] = []
         current = end
 
@@ -230,9 +878,41 @@ class RoadMap:
             current = prev
 
         path.reverse()
-        return path
+        return self.expand_path(path) if expand else path
+
+    def _partial_path(self, came_from_lookup:dict[Node, tuple[Edge | None, Node | None]], explored:set[Node],
+    destination:Node) -> list[Node|Edge]:
+        """
+        The path to the settled node closest to `destination` in a
+        straight line, for searches that stop before reaching it.
+        """
+        if not explored:
+            return []
+        destination_xy = self.node_xy[destination.index]
+        closest = min(explored, key=lambda node: float(np.hypot(*(self.node_xy[node.index] - destination_xy))))
+        return self._reconstruct_path(came_from_lookup, closest)
+
+    @staticmethod
+    def expand_path(path:list[Node|Edge]) -> list[Node|Edge]:
+        """
+        Replaces every `ChainRoad` in a path with the original roads
+        and shape points it stands in for.
+        """
+        if not any(isinstance(item, ChainRoad) for item in path):
+            return path
+
+        expanded:list[Node|Edge] = []
+        for item in path:
+            if isinstance(item, ChainRoad):
+                for segment in item.segments[:-1]:
+                    expanded.append(segment)
+                    expanded.append(segment.end) # type: ignore
+                expanded.append(item.segments[-1])
+            else:
+                expanded.append(item)
+        return expanded
     
-    def get_path_time_estimate(self, path:list[Node|Edge]):
+    def get_path_time_estimate(self, path:list[Node|Edge], profile:VehicleProfile = CAR):
         total_cost = 0.0
     
         for i in range(len(path)):
@@ -240,10 +920,35 @@ class RoadMap:
                 edge = path[i]
                 if i + 1 < len(path) and isinstance(path[i + 1], Node):
                     node = path[i + 1]
-                    total_cost += self.road_cost(edge.data | node.data)
+                    total_cost += self.road_cost(edge.data | node.data, profile)
         
         return total_cost
 
+
+    def get_path_leg_estimates(self, path:list[Node|Edge], profile:VehicleProfile = CAR) -> np.ndarray:
+        """
+        The cumulative time estimate in hours at the end of every road in
+        a path, the last one being `get_path_time_estimate`.  Roads of the
+        graph read the precomputed edge costs and the original roads inside
+        an expanded `ChainRoad` read theirs through `road_slots`.  Only
+        roads from another graph are priced one by one.
+        """
+        edge_costs = self._edge_cost_list(profile)
+        road_costs = self.road_costs(profile)
+        road_slots = self.road_slots
+        leg_costs:list[float] = []
+
+        for i in range(len(path)):
+            edge = path[i]
+            if isinstance(edge, Edge) and i + 1 < len(path) and isinstance(path[i + 1], Node):
+                if 0 <= edge.index < len(self.edges) and self.edges[edge.index] is edge:
+                    leg_costs.append(edge_costs[edge.index])
+                elif edge in road_slots:
+                    leg_costs.append(float(road_costs[road_slots[edge]]))
+                else:
+                    leg_costs.append(self.road_cost(edge.data | path[i + 1].data, profile))
+
+        return np.cumsum(np.array(leg_costs, dtype=np.float64))
     
     def draw_map(
         self,
@@ -255,6 +960,7 @@ class RoadMap:
         """
         Draws the full road map inside the bounding box.
         """
+        from PIL import Image, ImageDraw
 
         stop_icon = Image.open("./image_assets/stop_icon.png").convert("L")
         traffic_signals_icon = Image.open("./image_assets/traffic_icon.png").convert("L")
@@ -275,7 +981,7 @@ class RoadMap:
             return (x, y)
 
         defered_draws = []
-        for edge in self.edges:
+        for edge in (segment for road in self.edges for segment in (road.segments if isinstance(road, ChainRoad) else [road])):
             start = edge.start
             end = edge.end
 
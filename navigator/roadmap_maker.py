@@ -1,29 +1,53 @@
+from __future__ import annotations
+import json
 import pickle
 import os
-from typing import Any, Literal
-from pyrosm import OSM
-from geopandas import GeoDataFrame
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Mapping
 from pathlib import Path
+import pyarrow as pa
+import shapely
 
-from navigator.roadmap import RoadMap, Node, Edge, NodeFactory, EdgeFactory
+from navigator.roadmap import RoadMap, Node, Edge, NodeFactory, EdgeFactory, ChainRoad, ShapePoint, PROFILES
+from navigator.roadmap.components import tag_components
+from navigator.roadmap.ordering import bfs_order, hilbert_order
+
+# pyrosm, geopandas and pandas are only imported once extraction or the
+# geodataframe caches are needed, so loading a cached graph stays light
+if TYPE_CHECKING:
+    from geopandas import GeoDataFrame
 
 class RoadMapMaker:
     """
     This class reads the graph data file and
     turns it into a graph called a `RoadMap`.
     """
+    # bump whenever the layout of the columnar cache changes
+    CACHE_VERSION = 1
+    ARROW_EXTENSION = f".v{CACHE_VERSION}.arrow"
+
     bounding_box:list[float]
     pbf_file_path:Path
     cache_name:str
     cache_folder:Path
     stdout_enabled:bool
+    min_component_size:int
+    cache_format:Literal["arrow", "pickle"]
+    compact:bool
+    node_order:Literal["hilbert", "bfs", "none"]
+    prepare_profiles:bool
     
     def __init__(self,
         bounding_box:list[float],
         pbf_file_path:str,
         cache_name:str,
         cache_folder_name:str = ".GEOCACHE",
-        stdout_enabled:bool = True
+        stdout_enabled:bool = True,
+        min_component_size:int = 0,
+        cache_format:Literal["arrow", "pickle"] = "arrow",
+        compact:bool = True,
+        node_order:Literal["hilbert", "bfs", "none"] = "hilbert",
+        prepare_profiles:bool = True
     ):
         self.bounding_box = bounding_box
         self.pbf_file_path = Path(pbf_file_path)
@@ -31,37 +55,170 @@ class RoadMapMaker:
         self.cache_folder = Path("./" + cache_folder_name)
         self.cache_folder.mkdir(exist_ok=True)
         self.stdout_enabled = stdout_enabled
+        # islands with fewer nodes than this are dropped from the graph
+        self.min_component_size = min_component_size
+        self.cache_format = cache_format
+        # collapse chains of shape points into single routing edges
+        self.compact = compact
+        # renumber nodes so roads that are close on the map are close in memory
+        self.node_order = node_order
+        # build the costs, components and snapping trees of every profile in
+        # `PROFILES` with the graph, so no query pays for them
+        self.prepare_profiles = prepare_profiles
 
     def print(self, msg:Any):
         if self.stdout_enabled:
             print(str(msg))
 
-    def get_cache_file_path(self, file_suffix:str) -> Path:
-        return self.cache_folder / f"{self.cache_name}{file_suffix}.pkl"
+    def get_cache_file_path(self, file_suffix:str, extension:str = ".pkl") -> Path:
+        return self.cache_folder / f"{self.cache_name}{file_suffix}{extension}"
 
     def _cache_gdf(self, gdf:GeoDataFrame, tag:str):
         self.print(f"Saving geodataframe cache with tag: {tag}")
 
-        with open(self.get_cache_file_path(f"_{tag}_gdf"), "wb") as f:
-            pickle.dump(gdf, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.cache_format == "arrow":
+            self._write_arrow_gdf(gdf, self.get_cache_file_path(f"_{tag}_gdf", self.ARROW_EXTENSION))
+        else:
+            with open(self.get_cache_file_path(f"_{tag}_gdf"), "wb") as f:
+                pickle.dump(gdf, f, protocol=pickle.HIGHEST_PROTOCOL)
 
         self.print(f"Geodataframe cache saved with tag: {tag}")
 
-    def _cache_load_gdf(self, tag:str) -> GeoDataFrame | None:
+    def _cache_load_gdf(self, tag:str, columns:list[str] | None = None) -> GeoDataFrame | None:
+        if self.cache_format == "arrow":
+            gdf_path = self.get_cache_file_path(f"_{tag}_gdf", self.ARROW_EXTENSION)
+            if gdf_path.exists():
+                self.print(f"Loading cached geodataframe with tag: {tag}")
+
+                gdf = self._read_arrow_gdf(gdf_path, columns)
+
+                if gdf is not None:
+                    self.print(f"Loaded cached geodataframe with tag: {tag}")
+                    return gdf
+
+                self.print(f"Ignoring cached geodataframe with tag {tag} written by another cache version.")
+
         gdf_path = self.get_cache_file_path(f"_{tag}_gdf")
         if gdf_path.exists():
-            self.print(f"Loading cached geodataframe with tag: {tag}")
+            self.print(f"Loading pickled geodataframe with tag: {tag}")
 
             with open(gdf_path, "rb") as f:
                 gdf = pickle.load(f)
 
-            self.print(f"Loaded cached geodataframe with tag: {tag}")
+            self.print(f"Loaded pickled geodataframe with tag: {tag}")
+
+            if self.cache_format == "arrow":
+                # move old pickle caches over to the columnar format
+                self._cache_gdf(gdf, tag)
 
             return gdf
         
         return None
 
+    def _write_arrow_gdf(self, gdf:GeoDataFrame, path:Path):
+        """
+        Writes a geodataframe as an uncompressed Arrow IPC file so it can be
+        memory mapped on read.  Geometry is stored as WKB and the `tags`
+        column as JSON text.
+        """
+        from pandas import DataFrame
+
+        frame = DataFrame(gdf.drop(columns=gdf.geometry.name))
+        frame[gdf.geometry.name] = shapely.to_wkb(gdf.geometry.values)
+        if "tags" in frame.columns:
+            frame["tags"] = [json.dumps(tags, default=str) for tags in frame["tags"]]
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({
+            "cache_version": str(self.CACHE_VERSION),
+            "geometry_column": gdf.geometry.name,
+            "crs": gdf.crs.to_string() if gdf.crs else "",
+        })
+
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def _read_arrow_gdf(self, path:Path, columns:list[str] | None = None) -> GeoDataFrame | None:
+        """
+        Memory maps an Arrow IPC cache and only decodes `columns`.
+
+        :return: The geodataframe or `None` when the file was written by
+            another cache version.
+        """
+        from geopandas import GeoDataFrame
+        from pandas import DataFrame, Series
+
+        arrow_cache = self._open_arrow_cache(path, columns)
+        if arrow_cache is None:
+            return None
+        table, geometry_column, crs = arrow_cache
+
+        frame = DataFrame({
+            # text columns stay python objects with None for missing values like the pickled frames
+            name: Series(column.to_pylist(), dtype=object) if pa.types.is_string(column.type) or pa.types.is_large_string(column.type) else column.to_numpy()
+            for name, column in zip(table.column_names, table.columns)
+        })
+        if "tags" in frame.columns:
+            frame["tags"] = [json.loads(tags) if tags is not None else None for tags in frame["tags"]]
+
+        if geometry_column not in frame.columns:
+            return GeoDataFrame(frame)
+
+        return GeoDataFrame(frame, geometry=shapely.from_wkb(frame.pop(geometry_column).values), crs=crs)
+
+    def _open_arrow_cache(self, path:Path, columns:list[str] | None = None) -> tuple[pa.Table, str, str | None] | None:
+        """
+        Memory maps an Arrow IPC cache and selects `columns` from it.
+
+        :return: The table, the name of its geometry column and its crs,
+            or `None` when the file was written by another cache version.
+        """
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if metadata.get(b"cache_version") != str(self.CACHE_VERSION).encode():
+                return None
+
+            geometry_column = metadata[b"geometry_column"].decode()
+            crs = metadata[b"crs"].decode() or None
+            table = reader.read_all()
+
+        if columns is not None:
+            table = table.select([name for name in table.column_names if name in columns])
+
+        return table, geometry_column, crs
+
+    def _cache_load_records(self, tag:str, columns:list[str]) -> list[dict[str, Any]] | None:
+        """
+        Reads an Arrow cache straight into row dicts without going through
+        pandas or geopandas.
+        """
+        gdf_path = self.get_cache_file_path(f"_{tag}_gdf", self.ARROW_EXTENSION)
+        if not gdf_path.exists():
+            return None
+
+        arrow_cache = self._open_arrow_cache(gdf_path, columns)
+        if arrow_cache is None:
+            return None
+        table, geometry_column, _ = arrow_cache
+
+        records = table.to_pylist()
+        if "tags" in table.column_names:
+            for record in records:
+                if record["tags"] is not None:
+                    record["tags"] = json.loads(record["tags"])
+        if geometry_column in table.column_names:
+            geometries = shapely.from_wkb(table.column(geometry_column).to_pylist())
+            for record, geometry in zip(records, geometries):
+                record[geometry_column] = geometry
+
+        return records
+
     def _load_raw_graph(self) -> tuple[GeoDataFrame, GeoDataFrame]:
+        from geopandas import GeoDataFrame
+        from pyrosm import OSM
+
         osm = OSM(str(self.pbf_file_path), bounding_box=self.bounding_box)
         result = osm.get_network(
             network_type="driving",
@@ -76,15 +233,25 @@ class RoadMapMaker:
         return nodes, edges
     
     def convert_gdf_to_graph(self, nodes:GeoDataFrame, edges:GeoDataFrame) -> RoadMap:
+        return self.convert_records_to_graph(nodes.to_dict("records"), edges.to_dict("records"))
+
+    def convert_records_to_graph(self, nodes:Iterable[Mapping[str, Any]], edges:list[Mapping[str, Any]]) -> RoadMap:
         self.print("Building graph (This may take a minute.)...")
 
         node_by_id:dict[int, Node] = {}
         edge_list:list[Edge] = []
 
-        for _, row in nodes.iterrows():
-            node_by_id[row['id']] = NodeFactory.produce(row, edges)
+        # how many edge rows touch every node
+        connections:Counter[int] = Counter()
+        for row in edges:
+            connections[row['u']] += 1
+            if row['v'] != row['u']:
+                connections[row['v']] += 1
 
-        for _, row in edges.iterrows():
+        for row in nodes:
+            node_by_id[row['id']] = NodeFactory.produce(row, connections[row['id']])
+
+        for row in edges:
             start_id:int = row['u']
             end_id:int = row['v']
 
@@ -104,15 +271,143 @@ class RoadMapMaker:
                     end_node.edges.append(reverse_edge)
 
                 edge_list.append(reverse_edge)
+
+        node_list = list(node_by_id.values())
+        node_list, edge_list = self._prune_components(node_list, edge_list)
+        if self.compact:
+            node_list, edge_list = self._compact_shape_points(node_list, edge_list)
+        if self.node_order != "none":
+            node_list, edge_list = self._reorder(node_list, edge_list)
+
+        graph = RoadMap(node_list, edge_list)
+        if self.prepare_profiles:
+            self.print("Preparing vehicle profiles...")
+            for profile in PROFILES.values():
+                graph.prepare(profile)
                 
-        return RoadMap(list(node_by_id.values()), edge_list)
+        return graph
+
+    def _prune_components(self, nodes:list[Node], edges:list[Edge]) -> tuple[list[Node], list[Edge]]:
+        """
+        Tags every node with its connected components and drops islands
+        that are smaller than `min_component_size`.
+        """
+        self.print("Finding connected components...")
+        tag_components(nodes)
+
+        if self.min_component_size <= 1:
+            return nodes, edges
+
+        island_sizes = Counter(node.weak_component for node in nodes)
+        kept_nodes = [node for node in nodes if island_sizes[node.weak_component] >= self.min_component_size]
+        kept = set(kept_nodes)
+        kept_edges = [
+            edge for edge in edges
+            if (edge.start is None or edge.start in kept) and (edge.end is None or edge.end in kept)
+        ]
+        self.print(f"Dropped {len(nodes) - len(kept_nodes)} nodes on islands smaller than {self.min_component_size} nodes.")
+
+        return kept_nodes, kept_edges
+
 
+    def _compact_shape_points(self, nodes:list[Node], edges:list[Edge]) -> tuple[list[Node], list[Edge]]:
+        """
+        Collapses maximal chains of shape points into single `ChainRoad`
+        edges so searches don't expand every geometry vertex of a road.
+
+        A shape point is only collapsed when it has exactly two neighbours
+        and traffic passes straight through it, so every path through the
+        compacted graph maps back onto the original one.
+        """
+        self.print("Compacting shape points...")
+
+        incoming:dict[Node, list[Edge]] = {node: [] for node in nodes}
+        for node in nodes:
+            for edge in node.edges:
+                if edge.end in incoming:
+                    incoming[edge.end].append(edge) # type: ignore
+
+        def passes_through(node:Node) -> bool:
+            if not isinstance(node, ShapePoint):
+                return False
+            outgoing = node.edges
+            if len(outgoing) not in (1, 2) or len(incoming[node]) != len(outgoing):
+                return False
+            if any(edge.end is None or edge.end is node for edge in outgoing):
+                return False
+            neighbors = {edge.end for edge in outgoing} | {edge.start for edge in incoming[node]}
+            if len(neighbors) != 2:
+                return False
+            # every way out must be reachable from the other neighbour
+            return all(
+                any(edge.start is not out.end for edge in incoming[node])
+                for out in outgoing
+            )
+
+        collapsible = {node for node in nodes if passes_through(node)}
+
+        absorbed:set[Edge] = set()
+        removed:set[Node] = set()
+        chains:list[Edge] = []
+        for node in nodes:
+            if node in collapsible:
+                continue
+            routing_edges:list[Edge] = []
+            for edge in node.edges:
+                if edge.end not in collapsible:
+                    routing_edges.append(edge)
+                    continue
+                segments = [edge]
+                previous, current = node, edge.end
+                while current in collapsible:
+                    removed.add(current) # type: ignore
+                    segment = next(out for out in current.edges if out.end is not previous) # type: ignore
+                    segments.append(segment)
+                    previous, current = current, segment.end
+                absorbed.update(segments)
+                chain = ChainRoad(node, current, segments)
+                routing_edges.append(chain)
+                chains.append(chain)
+            node.edges = routing_edges
+
+        compact_nodes = [node for node in nodes if node not in removed]
+        compact_edges = [edge for edge in edges if edge not in absorbed] + chains
+        self.print(f"Compacted graph from {len(nodes)} nodes and {len(edges)} edges to {len(compact_nodes)} nodes and {len(compact_edges)} edges.")
+
+        return compact_nodes, compact_edges
+    
+    def _reorder(self, nodes:list[Node], edges:list[Edge]) -> tuple[list[Node], list[Edge]]:
+        """
+        Renumbers nodes along `node_order` and groups edges by the new
+        position of their start node.  `RoadMap` derives every index, the
+        KD-trees, the CSR adjacency and the cost arrays from these lists,
+        so they all follow the new order.
+        """
+        self.print(f"Reordering nodes ({self.node_order})...")
+
+        ordered_nodes = hilbert_order(nodes) if self.node_order == "hilbert" else bfs_order(nodes)
+        rank = {node: position for position, node in enumerate(ordered_nodes)}
+        # edges without a known start node go last
+        ordered_edges = sorted(edges, key=lambda edge: rank.get(edge.start, len(rank))) # type: ignore
+
+        return ordered_nodes, ordered_edges
     
     def load(self) -> RoadMap:
         self.print("Creating Road Map...")
+
+        if self.cache_format == "arrow":
+            # query-only path: nothing but pyarrow and shapely is needed to
+            # rebuild the graph from the columnar cache
+            self.print("Attempting to find cached tables...")
+            node_rows = self._cache_load_records(f"{self.cache_name}_nodes", NodeFactory.COLUMNS)
+            edge_rows = self._cache_load_records(f"{self.cache_name}_edges", EdgeFactory.COLUMNS)
+            if node_rows is not None and edge_rows is not None:
+                self.print("Found cached tables!")
+                return self.convert_records_to_graph(node_rows, edge_rows)
+
         self.print("Attempting to find cached geodataframes...")
-        nodes = self._cache_load_gdf(f"{self.cache_name}_nodes")
-        edges = self._cache_load_gdf(f"{self.cache_name}_edges")
+        nodes = self._cache_load_gdf(f"{self.cache_name}_nodes", NodeFactory.COLUMNS)
+        edges = self._cache_load_gdf(f"{self.cache_name}_edges", EdgeFactory.COLUMNS)
         if nodes is None or edges is None:
             self.print(f"No cached geodataframes found!\nExtracting from PBF file '{self.pbf_file_path}'.\nThis may take a long time...")
             
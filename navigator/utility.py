@@ -1,15 +1,21 @@
-from PIL import Image, ImageDraw
-from shapely.geometry import LineString
+from __future__ import annotations
+from typing import TYPE_CHECKING
 
+import numpy as np
 from navigator.roadmap.edge import Edge
+from navigator.roadmap.edge_types import join_coordinates
 from navigator.roadmap.node import Node
 from navigator.roadmap.node_types import TrafficControl, ShapePoint, Junction
+if TYPE_CHECKING:
+    from PIL import Image
 
 def draw_path(img:Image.Image, path: list[Node | Edge], 
                        bbox: tuple[float, float, float, float]|list[float], 
                        image_size: tuple[int, int] = (800, 600), 
                        path_color: tuple[int,int,int]=(255,0,0), 
                        path_width: int=3) -> Image.Image:
+    from PIL import Image, ImageDraw
+
     stop_icon = Image.open("./image_assets/stop_icon.png")
     traffic_signals_icon = Image.open("./image_assets/traffic_icon.png")
 
@@ -24,11 +30,9 @@ def draw_path(img:Image.Image, path: list[Node | Edge],
     draw = ImageDraw.Draw(img)
 
     deffered_draws = []
-    coords = []
     for item in path:
         if isinstance(item, Node):  # Node
             coord = project(item.x, item.y)
-            coords.append(coord)
             coord = (int(coord[0]), int(coord[1]))
             if 'highway' in item.tags:
                 if item.tags['highway'] == "stop":
@@ -38,10 +42,9 @@ def draw_path(img:Image.Image, path: list[Node | Edge],
                 else:
                     highway_tag = item.tags['highway']
                     deffered_draws.append((draw.text, (coord, highway_tag, 'black')))
-                
-        elif isinstance(item, Edge):  # Edge with geometry
-            for lon, lat in item.geometry.coords:
-                coords.append(project(lon, lat))
+
+    lonlat = path_coordinates(path)
+    coords = [project(lon, lat) for lon, lat in lonlat]
 
     # Draw lines between consecutive points
     if len(coords) >= 2:
@@ -51,3 +54,57 @@ def draw_path(img:Image.Image, path: list[Node | Edge],
         f(*a)
 
     return img
+
+def path_coordinates(path:list[Node | Edge], tolerance:float = 0.0) -> np.ndarray:
+    """
+    The `(lon, lat)` points a path drives through, taken from the geometry
+    of all its roads at once, joined by `join_coordinates`.
+
+    A `tolerance` above zero simplifies the line with Douglas-Peucker, in
+    degrees (1e-5 is about a meter).
+
+    :return: A float64 array of shape (n, 2).
+    :rtype: np.ndarray
+    """
+    import shapely
+
+    edges = [item for item in path if isinstance(item, Edge) and item.geometry is not None]
+    if not edges:
+        return np.array([(item.x, item.y) for item in path if isinstance(item, Node)], dtype=np.float64).reshape(-1, 2)
+
+    coords = join_coordinates(edges)
+
+    if tolerance > 0 and len(coords) > 2:
+        coords = shapely.get_coordinates(shapely.simplify(shapely.linestrings(coords), tolerance, preserve_topology=False))
+
+    return coords
+
+def encode_polyline(coords:np.ndarray, precision:int = 5) -> str:
+    """
+    Encodes `(lon, lat)` points with Google's encoded polyline algorithm,
+    which writes latitude first.
+    """
+    if len(coords) == 0:
+        return ""
+
+    scaled = np.round(np.asarray(coords, dtype=np.float64)[:, ::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    # every value is written as 5 bit chunks, lowest first, with 0x20 set
+    # on all but the last chunk
+    shifts = np.arange(13, dtype=np.uint64) * np.uint64(5)
+    shifted = values[:, None] >> shifts
+    chunk_count = np.maximum((shifted > 0).sum(axis=1), 1)
+    used = np.arange(13) < chunk_count[:, None]
+    more = np.arange(13) < (chunk_count - 1)[:, None]
+    chars = (shifted & np.uint64(31)) + np.where(more, 0x20, 0).astype(np.uint64) + np.uint64(63)
+
+    return chars[used].astype(np.uint8).tobytes().decode("ascii")
+
+def coordinates_to_buffer(coords:np.ndarray) -> bytes:
+    """
+    Packs `(lon, lat)` points into a flat little endian float32 buffer,
+    `lon0, lat0, lon1, lat1, ...`.
+    """
+    return np.ascontiguousarray(coords, dtype="<f4").tobytes()